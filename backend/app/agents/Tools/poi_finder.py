@@ -1,37 +1,50 @@
 from agents.base_agent import BaseAgent
 import os
-import requests
+import asyncio
+import httpx
 from dotenv import load_dotenv
-from geopy.geocoders import Nominatim
+from utils.geocoding.geocode_cache import get_cached_geocoder
 from typing import Dict, List
 
 load_dotenv()
 
+PLACES_SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+
+# one pooled client for every proposal, so Places calls reuse kept-alive connections
+_http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        )
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 class POIFinderAgent(BaseAgent):
     """
     Finds nearby POIs based on a given location.
     """
     def __init__(self):
-        self.geolocator = Nominatim(user_agent="cicero")
+        self.geocoder = get_cached_geocoder()
         super().__init__(tools=[])
 
     def _get_coordinates(self, address: str) -> tuple[float, float] | None:
         """
         Get the coordinates of a given address.
         """
-        try:
-            print(f"Getting coordinates for {address}")
-            location = self.geolocator.geocode(address)
-            if location:
-                return [location.latitude, location.longitude]
-            
-        except Exception as e:
-            print(f"Error getting coordinates for {address}: {e}")
-            return None
+        print(f"Getting coordinates for {address}")
+        coordinates = self.geocoder.geocode(address)
+        return list(coordinates) if coordinates else None
 
-    def text_search(self, query, **kwargs):
-        url = "https://places.googleapis.com/v1/places:searchText"
-        
+    async def text_search(self, query, **kwargs):
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": os.getenv("GPLACES_API_KEY"),
@@ -43,8 +56,12 @@ class POIFinderAgent(BaseAgent):
             **kwargs
         }
         
-        response = requests.post(url, headers=headers, json=data)
-        return response.json()
+        try:
+            response = await get_http_client().post(PLACES_SEARCH_URL, headers=headers, json=data)
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Error searching places for {query}: {e}")
+            return {}
 
 
     def _structure_places(self, places: Dict) -> List[Dict]:
@@ -61,12 +78,10 @@ class POIFinderAgent(BaseAgent):
             })
         return structured
 
-    async def process(self, location: str, zoning_info: Dict, summary: str, solution_outline: str) -> Dict[str, List[Dict]]:
+    async def _generate_query(self, location: str, zoning_info: Dict, summary: str, solution_outline: str) -> str | None:
         """
-        Process the location to find nearby POIs.
+        Ask the LLM for a Google Places search query suited to the complaint.
         """
-        coords = self._get_coordinates(f"{location}, Toronto, Canada")
-
         prompt = f"""
         You are a member of a team that is tasked with coming up with a municipal proposal for the city of Toronto. You are tackling the following issue:
 
@@ -85,12 +100,25 @@ class POIFinderAgent(BaseAgent):
         try:
             query = await self.llm.ainvoke(prompt)
             print(f"Query for poi finder: {query.content}")
+            return query.content
         except Exception as e:
             print(f"Error getting query for poi finder: {e}")
+            return None
+
+    async def process(self, location: str, zoning_info: Dict, summary: str, solution_outline: str) -> Dict[str, List[Dict]]:
+        """
+        Process the location to find nearby POIs.
+        """
+        # geocoding and writing the search query don't depend on each other, so they run together
+        coords, query = await asyncio.gather(
+            asyncio.to_thread(self._get_coordinates, f"{location}, Toronto, Canada"),
+            self._generate_query(location, zoning_info, summary, solution_outline),
+        )
+        if query is None:
             return []
         
-        places = self.text_search(
-            query.content,
+        places = await self.text_search(
+            query,
             # Optional parameters
             locationBias={
                 "circle": {
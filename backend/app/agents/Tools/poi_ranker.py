@@ -6,8 +6,8 @@ class POIRankerAgent(BaseAgent):
     """
     Ranks POIs based on zoning compatibility.
     """
-    def __init__(self):
-        self.zoning_checker = ZoningCheckerAgent()
+    def __init__(self, zoning_checker: ZoningCheckerAgent | None = None):
+        self.zoning_checker = zoning_checker or ZoningCheckerAgent()
         super().__init__(tools=[])
 
     async def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -20,12 +20,12 @@ class POIRankerAgent(BaseAgent):
         if not pois:
             return {"error": "No POIs provided"}
 
-        # Get zoning for each POI
+        # Get zoning for all POIs in one pass over the zoning data
+        located_pois = [poi for poi in pois if poi.get('coordinates')]
+        zone_infos = await self.zoning_checker.process_batch([poi['coordinates'] for poi in located_pois])
+
         poi_zones = []
-        for poi in pois:
-            if not poi.get('coordinates'):
-                continue
-            zone_info = await self.zoning_checker.process(poi['coordinates'])
+        for poi, zone_info in zip(located_pois, zone_infos):
             if 'error' not in zone_info:
                 poi_zones.append({
                     **poi,
@@ -1,7 +1,7 @@
 from agents.base_agent import BaseAgent
-from bs4 import BeautifulSoup
 import requests
 import re
+from utils.data_scraping.html_text import extract_text, parse_html
 from langchain_core.tools import Tool
 
 class PolicyResearcherAgent(BaseAgent):
@@ -31,20 +31,17 @@ class PolicyResearcherAgent(BaseAgent):
             formatted_chapter = '_'.join(chapter_parts)
 
             url = f"{self.base_url}/ZBL_NewProvision_Chapter{formatted_chapter}.htm"
-            response = requests.get(url)
+            response = requests.get(url, timeout=15)
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            root = parse_html(response.content, response.headers.get("Content-Type", ""))
+            if root is None:
+                return ""
 
-            content = ""
-            rows = soup.find_all('tr')
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) >= 2:
-                    text = cells[1].get_text().strip()
-                    content += text + "\n"
+            # the provision text sits in the second cell of each table row
+            content = "\n".join(cell.text_content().strip() for cell in root.xpath("//tr[count(td) >= 2]/td[2]"))
 
-            if not content:
-                content = soup.get_text()
+            if not content.strip():
+                content = extract_text(root, max_chars=6000)
             
             text = re.sub(r'\s+', ' ', content.strip())
             return text[:6000]  # Limit length for LLM processing
@@ -1,29 +1,25 @@
-from shapely.geometry import shape, Point
-import geopandas as gpd
 from agents.base_agent import BaseAgent
+from services.zoning_store import ZoningStore, DEFAULT_ZONING, get_zoning_store
 
 class ZoningCheckerAgent(BaseAgent):
-    def __init__(self):
-        self.zoning_data = gpd.read_file("backend/data/Zoning Area 4326.geojson")
+    def __init__(self, zoning_store: ZoningStore | None = None):
+        self.zoning_store = zoning_store if zoning_store is not None else get_zoning_store()
         super().__init__(tools=[])
 
+    async def process_batch(self, locations: list[list[float]]) -> list[dict]:
+        """
+        Check zoning for many [lat, lon] locations at once. Results keep the input order.
+        """
+        if not locations:
+            return []
+        print(f"Checking zoning for {len(locations)} locations")
+        return self.zoning_store.lookup_many(locations)
 
     async def process(self, location: list[float, float]) -> dict:
         print(f"Checking zoning for {location}")
-        point = Point(location[1], location[0])
-        for _, zone in self.zoning_data.iterrows():
-            if shape(zone.geometry).contains(point):
-                print(f"Zoning found: {zone['ZN_ZONE']}")
-                return {
-                    "zone_type": zone["ZN_ZONE"],
-                    "bylaw_chapter": zone["ZBL_CHAPT"],
-                    "bylaw_section": zone["ZBL_SECTN"],
-                    "bylaw_exception": zone["ZBL_EXCPTN"],
-                }
+        zone_info = self.zoning_store.lookup(location)
+        if zone_info is not None:
+            print(f"Zoning found: {zone_info['zone_type']}")
+            return zone_info
         print("No zoning found")
-        return {
-            "zone_type": "CR",
-            "bylaw_chapter": "40",
-            "bylaw_section": "40.10",
-            "bylaw_exception": "",
-        }
+        return dict(DEFAULT_ZONING)
@@ -12,6 +12,7 @@ from agents.Tools.policy_researcher import PolicyResearcherAgent
 from agents.Tools.proposal_writer import ProposalWriterAgent
 from agents.Tools.poi_ranker import POIRankerAgent
 import json
+import asyncio
 from dotenv import load_dotenv
 import os
 from datetime import datetime
@@ -43,9 +44,11 @@ class ProposalSupervisor:
         self.llm = ChatOpenAI(model="gpt-4o-mini")
         self.zone_policy_researcher = PolicyResearcherAgent()
         self.poi_finder = POIFinderAgent()
-        self.poi_ranker = POIRankerAgent()
         self.zoning_checker = ZoningCheckerAgent()
+        self.poi_ranker = POIRankerAgent(self.zoning_checker)
         self.proposal_writer = ProposalWriterAgent()
+        self.search_concurrency = int(os.getenv("TAVILY_CONCURRENCY", "4"))
+        self.search_timeout = float(os.getenv("TAVILY_TIMEOUT", "30"))
     
     async def emit_status(self, task_type: str, action: str, status: str, data: Any = None):
         try:
@@ -62,6 +65,40 @@ class ProposalSupervisor:
             print(f"Error emitting status: {e}")
 
 
+    async def search(self, queries: List[str], action: str, **search_kwargs) -> List[Dict[str, Any]]:
+        """
+        Run Tavily searches concurrently, at most `search_concurrency` at a time.
+        Each query streams a progress event when it finishes; queries that fail or time out are left out.
+        """
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def run_query(query: str) -> Dict[str, Any] | None:
+            async with semaphore:
+                print(f"\nProcessing query: {query}")
+                try:
+                    # the Tavily client is synchronous, so it runs in a worker thread to keep the event loop free
+                    results = await asyncio.wait_for(
+                        asyncio.to_thread(self.tavily_client.search, query, **search_kwargs),
+                        timeout=self.search_timeout
+                    )
+                except Exception as e:
+                    print(f"Tavily search failed for query {query}: {e!r}")
+                    await self.emit_status(task_type="progress", action=action, status="error", data={"query": query})
+                    return None
+
+            print(f"Tavily results for query: {query}")
+            result = {
+                "query": query,
+                "answer": results['answer'],
+                "results": results['results'],
+                "sources": [result['title'] for result in results['results']]
+            }
+            await self.emit_status(task_type="progress", action=action, status="success", data={"query": query, "sources": result["sources"]})
+            return result
+
+        results = await asyncio.gather(*(run_query(query) for query in queries))
+        return [result for result in results if result is not None]
+
     async def determine_research_path(self, state: State) -> State:
         print("\n=== DETERMINING RESEARCH PATH ===")
         print(f"Summary: {state['summary'][:100]}...")
@@ -259,16 +296,12 @@ class ProposalSupervisor:
         Conduct research based on the research plan.
         """
         research_results = state["research_results"]
-        for query in state["research_plan"]["search_queries"]:
-            print(f"\nProcessing query: {query}")
-            results = self.tavily_client.search(query, include_answer=True, max_results=5)
-            print(f"Tavily results for query: {query}")
-            research_results.append({
-                "query": query,
-                "answer": results['answer'],
-                "results": results['results'],
-                "sources": [result['title'] for result in results['results']]
-            })
+        research_results.extend(await self.search(
+            state["research_plan"]["search_queries"],
+            action="Researching",
+            include_answer=True,
+            max_results=5
+        ))
         
         state["research_results"] = research_results
         await self.emit_status(task_type="update", action="Researching", status="success")
@@ -361,16 +394,7 @@ class ProposalSupervisor:
                       f"economic impact of {state['location']} Toronto",
                       f"social impact of {state['location']} Toronto"]
         
-        research_results = []
-        for query in queries:
-            print(f"\nProcessing web query: {query}")
-            results = self.tavily_client.search(query, include_answer=True)
-            research_results.append({
-                "query": query,
-                "answer": results['answer'],
-                "results": results['results'],
-                "sources": [result['title'] for result in results['results']]
-            })
+        research_results = await self.search(queries, action="Web Research", include_answer=True)
 
         state["research_results"] = research_results
         state["next_action"] = "evaluate_web_research"
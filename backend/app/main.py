@@ -1,16 +1,23 @@
-from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
 import asyncio
-from fastapi import HTTPException
-from typing import List
+from fastapi import HTTPException, Query
+from typing import List, Optional
 from dotenv import load_dotenv
-from schemas.complaint_types import GroupedComplaint, Source, ProposalInput
-from services.group_complaints import group_complaints
+from schemas.complaint_types import GroupedComplaint, ComplaintCluster, Source, ProposalInput
+from services.complaint_feed import complaint_feed, etag_matches
+from services.complaint_clusters import get_complaint_clusters, get_group_complaints, MAX_ZOOM
+from services.group_complaints import get_grouped_complaints_page, parse_bbox, parse_cursor, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
 from services.complaint_summary import generate_complaint_summary
-from services.data_saver import Complaint, SessionLocal, save_complaint_summary
+from services.data_saver import SessionLocal, save_complaint_summary
 from models.models import Base, engine
+from services.complaint_writer import upgrade_complaints_table
 from websocket_manager import manager
+from proposal_jobs import ProposalJob, ProposalJobQueue, job_queue_settings
 from agents.research_supervisor import ProposalSupervisor, State
+from agents.Tools.poi_finder import close_http_client
+from services.zoning_store import get_zoning_store
 load_dotenv()
 
 app = FastAPI()
@@ -27,6 +34,16 @@ app.add_middleware(
 # ensures tables are created if they don't exist
 Base.metadata.create_all(bind=engine)
 
+# adds columns and indexes missing from older tables; the duplicate-url cleanup is an ingest migration, not run here
+@app.on_event("startup")
+async def upgrade_tables():
+    upgrade_complaints_table()
+
+# load the shared zoning store once so proposals don't parse the zoning layer per request
+@app.on_event("startup")
+async def preload_zoning_store():
+    get_zoning_store()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Complaints API"}
@@ -62,10 +79,10 @@ async def proposal_websocket(websocket: WebSocket, client_id: str):
     except WebSocketDisconnect:
         manager.disconnect(client_id)
 
-@app.post("/api/proposals/generate/{client_id}")
-async def generate_proposal(complaint: ProposalInput, client_id: str):
-    supervisor = ProposalSupervisor(client_id)
+async def run_proposal_job(job: ProposalJob):
+    supervisor = ProposalSupervisor(job.client_id)
     graph = supervisor.create_graph()
+    complaint = ProposalInput(**job.payload)
     
     state = State(
         location=complaint.location,
@@ -83,21 +100,101 @@ async def generate_proposal(complaint: ProposalInput, client_id: str):
         proposal={},
         research_feedback=""
     )
-    print("Invoking graph")
+    print(f"Invoking graph for job {job.id}")
     result = await graph.ainvoke(state)
     
-    return result
+    return jsonable_encoder(result)
+
+proposal_jobs = ProposalJobQueue(run_proposal_job, **job_queue_settings())
+
+@app.on_event("startup")
+async def start_proposal_jobs():
+    await proposal_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_proposal_jobs():
+    await proposal_jobs.stop()
+    await close_http_client()
+
+# proposals take minutes, so this only queues the job; progress and the result arrive over the
+# proposal websocket, and can also be polled from /api/proposals/jobs/{job_id}
+@app.post("/api/proposals/generate/{client_id}", status_code=202)
+async def generate_proposal(complaint: ProposalInput, client_id: str):
+    try:
+        job = proposal_jobs.submit(client_id, complaint.model_dump())
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/api/proposals/jobs/{job_id}")
+async def get_proposal_job(job_id: str):
+    job = proposal_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_message()
 
 @app.get("/api/complaints", response_model=List[GroupedComplaint])
-async def get_complaints():
+async def get_complaints(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    # viewport and paged requests go to the database; the plain feed is served from the cache below
+    if bbox is not None or cursor is not None or limit is not None:
+        try:
+            viewport = parse_bbox(bbox) if bbox is not None else None
+            after = parse_cursor(cursor) if cursor is not None else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        db = SessionLocal()
+        try:
+            page, next_cursor = get_grouped_complaints_page(db, viewport, after, limit or DEFAULT_PAGE_SIZE)
+        finally:
+            db.close()
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return page
+
     db = SessionLocal()
     try:
         print("Getting complaints")
-        complaints = db.query(Complaint).all()
-        grouped_complaints = group_complaints(complaints)
-        return grouped_complaints
+        etag, body = complaint_feed.get(db)
+    finally:
+        db.close()
+
+    # the map revalidates with If-None-Match, so an unchanged feed costs one version lookup
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# zoomed-out map view: counts and centroids per grid cell instead of one marker per complaint
+@app.get("/api/complaints/clusters", response_model=List[ComplaintCluster])
+async def get_clusters(zoom: int = Query(..., ge=0, le=MAX_ZOOM), bbox: Optional[str] = None):
+    try:
+        viewport = parse_bbox(bbox) if bbox is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db = SessionLocal()
+    try:
+        return get_complaint_clusters(db, zoom, viewport)
+    finally:
+        db.close()
+
+@app.get("/api/complaints/groups/{group}", response_model=List[GroupedComplaint])
+async def get_group(group: int):
+    db = SessionLocal()
+    try:
+        complaints = get_group_complaints(db, group)
     finally:
         db.close()
+    if not complaints:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return complaints
 
 @app.post("/api/complaints/summary")
 async def get_complaint_summary(complaint: GroupedComplaint):
@@ -1,7 +1,7 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, ARRAY, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, ARRAY, Float, Index, LargeBinary, literal_column, text
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.declarative import declarative_base
 from urllib.parse import quote_plus
 from sqlalchemy.orm import sessionmaker
@@ -27,17 +27,30 @@ class Complaint(Base):
     __tablename__ = "complaints1"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
-    body = Column(String)
+    body = deferred(Column(String)) # heavy columns load only when accessed, read endpoints project what they need
     url = Column(String)
     created_at = Column(Float)
     is_complaint = Column(Boolean)
     locations = Column(ARRAY(String))
     coordinates = Column(ARRAY(Float))
-    topics = Column(ARRAY(Float))
+    topics = deferred(Column(ARRAY(Float))) # legacy float8[] embedding, only set on rows saved before `embedding`
+    embedding = deferred(Column(LargeBinary)) # float32 bytes, see services.complaint_writer
     group = Column(Integer, ForeignKey("complaint_summaries.id"))
 
     summary = relationship("ComplaintSummary", back_populates="complaints")
 
+    # coordinates holds [[lat, lon], ...]; the first pair is where the complaint sits on the map,
+    # so viewport queries filter on it and pages are walked in (group, id) order
+    __table_args__ = (
+        Index("ix_complaints1_first_coordinate", text("(coordinates[1][1])"), text("(coordinates[1][2])")),
+        Index("ix_complaints1_group_id", "group", "id"),
+        Index("ux_complaints1_url", "url", unique=True), # complaints are upserted by url
+    )
+
+# the first [lat, lon] of a complaint, matching the expressions in ix_complaints1_first_coordinate
+first_latitude = literal_column("complaints1.coordinates[1][1]", Float)
+first_longitude = literal_column("complaints1.coordinates[1][2]", Float)
+
 # this is the summary of multiple complaints in a specific location about a specific issue
 class ComplaintSummary(Base):
     __tablename__ = "complaint_summaries"
@@ -48,4 +61,10 @@ class ComplaintSummary(Base):
     solution = Column(String)
     location = Column(ARRAY(String))
 
-    complaints = relationship("Complaint", back_populates="summary")
\ No newline at end of file
+    complaints = relationship("Complaint", back_populates="summary")
+
+# version counters bumped by every write that changes a derived view, so cached copies know when they are stale
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
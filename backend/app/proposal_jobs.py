@@ -0,0 +1,148 @@
+import asyncio
+import os
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from websocket_manager import manager
+
+@dataclass
+class ProposalJob:
+    id: str
+    client_id: str
+    payload: Dict[str, Any]
+    status: str = "queued" # queued -> running -> completed | failed
+    result: Any = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_message(self) -> dict:
+        return {
+            "type": "job",
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class ProposalJobQueue:
+    """
+    Runs proposal pipelines in the background on a bounded pool of async workers.
+
+    Each client can have at most `max_jobs_per_client` jobs admitted to the pool at once; the rest wait in a
+    per-client backlog, so one client submitting many proposals can't hold every worker. Job state is kept
+    in memory and the oldest finished jobs are dropped past `max_finished_jobs`.
+    """
+    def __init__(
+        self,
+        run_job: Callable[[ProposalJob], Awaitable[Any]],
+        max_workers: int = 4,
+        max_jobs_per_client: int = 1,
+        max_pending_jobs: int = 100,
+        max_finished_jobs: int = 500,
+    ):
+        self.run_job = run_job
+        self.max_workers = max_workers
+        self.max_jobs_per_client = max_jobs_per_client
+        self.max_pending_jobs = max_pending_jobs
+        self.max_finished_jobs = max_finished_jobs
+
+        self.jobs: "OrderedDict[str, ProposalJob]" = OrderedDict()
+        self.admitted: Dict[str, int] = defaultdict(int) # per client: jobs queued for or running on a worker
+        self.backlog: Dict[str, deque] = defaultdict(deque) # per client: jobs waiting for the client's cap
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: list[asyncio.Task] = []
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status in ("queued", "running"))
+
+    def submit(self, client_id: str, payload: Dict[str, Any]) -> ProposalJob:
+        """
+        Queue a job and return it immediately. Raises RuntimeError when too many jobs are already waiting.
+        """
+        if self.queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self.pending_count() >= self.max_pending_jobs:
+            raise RuntimeError("Too many proposals in progress, try again later")
+
+        job = ProposalJob(id=uuid.uuid4().hex, client_id=client_id, payload=payload)
+        self.jobs[job.id] = job
+        if self.admitted[client_id] < self.max_jobs_per_client:
+            self._admit(job)
+        else:
+            self.backlog[client_id].append(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ProposalJob]:
+        return self.jobs.get(job_id)
+
+    def _admit(self, job: ProposalJob):
+        self.admitted[job.client_id] += 1
+        self.queue.put_nowait(job)
+
+    def _release(self, job: ProposalJob):
+        self.admitted[job.client_id] -= 1
+        backlog = self.backlog[job.client_id]
+        if backlog:
+            self._admit(backlog.popleft())
+        if not self.admitted[job.client_id]:
+            del self.admitted[job.client_id]
+            del self.backlog[job.client_id]
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ("completed", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._release(job)
+                self.queue.task_done()
+
+    async def _run(self, job: ProposalJob):
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        await manager.send_message(job.client_id, job.to_message())
+        try:
+            job.result = await self.run_job(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            print(f"Proposal job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            self._prune()
+        await manager.send_message(job.client_id, job.to_message())
+
+
+def job_queue_settings() -> dict:
+    return {
+        "max_workers": int(os.getenv("PROPOSAL_WORKERS", "4")),
+        "max_jobs_per_client": int(os.getenv("PROPOSAL_JOBS_PER_CLIENT", "1")),
+        "max_pending_jobs": int(os.getenv("PROPOSAL_MAX_PENDING", "100")),
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class Urgency(BaseModel):
     score:int
@@ -28,4 +28,12 @@ class ProposalInput(BaseModel):
     location:str
     coordinates:List[float]
     summary:str
-    solution_outline:str
\ No newline at end of file
+    solution_outline:str
+
+class ComplaintCluster(BaseModel):
+    id: str
+    coordinates: List[float]
+    count: int
+    groups: int
+    urgency: Optional[int]
+    group: Optional[int]
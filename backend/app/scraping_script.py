@@ -1,78 +1,152 @@
 import os
+import argparse
+import numpy as np
 from dotenv import load_dotenv
 from utils.data_scraping.reddit_scraper import RedditScraper
 from utils.data_scraping.reddit_link_scraper import RedditLinkScraper
 from utils.data_scraping.data_processor import Processor
 from utils.data_scraping.toronto_scraper import TorontoScraper
-from models.models import Base, engine
-from services.data_saver import save_complaints
+from utils.data_scraping.checkpoints import StageCheckpoint
+from models.models import Base, SessionLocal, engine
+from services.data_saver import load_group_clusterer, migrate_complaint_urls, save_complaints
+from services.complaint_writer import upgrade_complaints_table
+from itertools import islice
 from tqdm import tqdm
+
+# scrape -> process (NLP) -> embed -> save; each stage checkpoints what it finished, so a rerun picks up where it stopped.
+# Stages stream their input a chunk at a time, so memory stays flat however many items there are.
+STAGES = ["scrape", "process", "embed", "save"]
+CHECKPOINT_CHUNK_SIZE = 256
+
 def is_image_url(url):
     image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
     return any(url.lower().endswith(ext) for ext in image_extensions)
 
+def chunks(items, size=CHECKPOINT_CHUNK_SIZE):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
 
-def main():
-    processor = Processor()
+def scrape_stage(raw):
     census_scraper1 = TorontoScraper(["data-research-maps"])
     reddit_link_scraper = RedditLinkScraper()
-    print("Initiated Toronto Scraper 1")  
+    print("Initiated Toronto Scraper 1")
     reddit_scraper = RedditScraper("toRANTo", 10)
     print("Initiated Reddit Scraper 1")
     reddit_scraper2 = RedditScraper("askTO", 10)
     print("Initiated Reddit Scraper 2")
-    reddit_scraper3 = RedditScraper("Toronto", 10)     
+    reddit_scraper3 = RedditScraper("Toronto", 10)
     print("Initiated Reddit Scraper 3")
+
+    reddit_data = reddit_scraper.scrape_reddit()
+    # reddit_data += reddit_scraper2.scrape_reddit()
+    # reddit_data += reddit_scraper3.scrape_reddit()
+
+    # census_data = census_scraper1.crawl_website_toronto("https://www.toronto.ca/city-government/data-research-maps/research-reports",500)
+
+
+    regular_posts = []
+    links = []
+
+    for post in tqdm(reddit_data, desc="Processing Reddit posts"):
+        if post['url'] in raw.done:
+            continue
+        if post['is_link_post']:
+            # Check if it's a valid external link to scrape
+            if ("reddit" not in post['url'] and
+                "redd" not in post['url'] and
+                "costar.com" not in post['url'] and
+                "cbc.ca" not in post['url'] and
+                not is_image_url(post['url'])):
+                links.append((post['url'], post['url']))
+        else:
+            regular_posts.append(post)
+
+    link_post_data = [
+        {
+            "title": link_data["title"],
+            "body": link_data["body"],
+            "url": link_data["url"],
+            "created": link_data["created"]
+        }
+        for link_data in reddit_link_scraper.scrape_links(links)
+    ]
+
+    saved = 0
+    for chunk in chunks(dict(post, source="reddit") for post in regular_posts):
+        saved += raw.write(chunk)
+    for chunk in chunks(dict(post, source="website") for post in link_post_data):
+        saved += raw.write(chunk)
+    print(f"Scraped {saved} new items ({len(raw)} in total).")
+
+def process_stage(processor, raw, processed):
+    before = len(processed)
+    for source, nlp in (("reddit", processor.nlp_reddit), ("website", processor.nlp_website)):
+        items = (item for item in raw.records(exclude=processed.done) if item['source'] == source)
+        for chunk in chunks(items):
+            processed.write(processor.process_items(chunk, nlp, embed=False))
+    print(f"Processed {len(processed) - before} items ({len(processed)} in total).")
+    print(f"Geocoding: {processor.geocoder.stats()}")
+
+def embed_stage(processor, processed, embeddings):
+    before = len(embeddings)
+    with tqdm(desc="Embedding", unit="docs") as progress:
+        for chunk in chunks(processed.records(exclude=embeddings.done)):
+            vectors = processor.embed([f"{item['title']} {item['body']}" for item in chunk])
+            embeddings.write(
+                {"url": item['url'], "embedding": vector.astype(np.float32)}
+                for item, vector in zip(chunk, vectors)
+            )
+            progress.update(len(chunk))
+    print(f"Embedded {len(embeddings) - before} items ({len(embeddings)} in total).")
+    print(f"Embedding store: {processor.embedding_store.stats()}")
+
+def save_stage(processed, embeddings, saved):
+    Base.metadata.create_all(bind=engine)
+    upgrade_complaints_table()
+    migrate_complaint_urls()
+    db = SessionLocal()
     try:
-        reddit_data = reddit_scraper.scrape_reddit()
-        # reddit_data += reddit_scraper2.scrape_reddit()
-        # reddit_data += reddit_scraper3.scrape_reddit()
-
-        # census_data = census_scraper1.crawl_website_toronto("https://www.toronto.ca/city-government/data-research-maps/research-reports",500)
-        
-        
-        regular_posts = []
-        link_post_data = []
-        
-        for post in tqdm(reddit_data, desc="Processing Reddit posts"):
-            if post['is_link_post']:
-                # Check if it's a valid external link to scrape
-                if ("reddit" not in post['url'] and 
-                    "redd" not in post['url'] and 
-                    "costar.com" not in post['url'] and 
-                    "cbc.ca" not in post['url'] and 
-                    not is_image_url(post['url'])):
-                    try:
-                        link_data = reddit_link_scraper.scrape_link(post['url'], post['url'])
-                        if link_data:
-                            link_post_data.append({
-                                "title": link_data["title"],
-                                "body": link_data["body"],
-                                "url": link_data["url"],
-                                "created": link_data["created"]
-                            })
-                    except Exception as e:
-                        print(f"Failed to scrape link {post['url']}: {e}")
-            else:
-                regular_posts.append(post)
-        
-        # processed_website_data1 = processor.process_data_website(census_data)
-
-        processed_regular_posts = processor.process_data_reddit(regular_posts)
-        processed_link_posts = processor.process_data_website(link_post_data)
-        
-        all_processed_data = processed_regular_posts + processed_link_posts
-        print(all_processed_data)
-
-        print(f"Processed {len(all_processed_data)} items.")
-        
-        Base.metadata.create_all(bind=engine)
-        save_complaints(all_processed_data)
-        
-        print("Data saved successfully.")
+        # one clusterer across chunks, so a group started in one chunk picks up matches from the next
+        clusterer = load_group_clusterer(db)
+    finally:
+        db.close()
 
+    total = 0
+    pending = (item for item in processed.records(exclude=saved.done) if item['url'] in embeddings.done)
+    for chunk in chunks(pending):
+        vectors = embeddings.get_many(item['url'] for item in chunk)
+        items = [
+            dict(item, embeddings=np.asarray(vectors[item['url']]['embedding'], dtype=np.float32))
+            for item in chunk
+        ]
+        save_complaints(items, clusterer=clusterer)
+        saved.write({"url": item['url']} for item in items)
+        total += len(items)
+    print(f"Saved {total} items ({len(saved)} in total).")
+
+def main(stage=None):
+    raw = StageCheckpoint("raw")
+    processed = StageCheckpoint("processed")
+    embeddings = StageCheckpoint("embeddings")
+    saved = StageCheckpoint("saved")
+
+    stages = [stage] if stage else STAGES
+    # the models take a while to load, so only when a stage needs them
+    processor = Processor() if {"process", "embed"} & set(stages) else None
+    try:
+        if "scrape" in stages:
+            scrape_stage(raw)
+        if "process" in stages:
+            process_stage(processor, raw, processed)
+        if "embed" in stages:
+            embed_stage(processor, processed, embeddings)
+        if "save" in stages:
+            save_stage(processed, embeddings, saved)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape, process and save Toronto complaints.")
+    parser.add_argument("--stage", choices=STAGES, help="run only this stage, from the previous stage's checkpoint")
+    main(parser.parse_args().stage)
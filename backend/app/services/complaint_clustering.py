@@ -0,0 +1,101 @@
+import numpy as np
+from tqdm import tqdm
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.69
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """
+    Stack embeddings into a float32 matrix of unit rows. Zero vectors stay zero, so they never match a group.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LeaderClusterer:
+    """
+    Leader clustering of complaint embeddings.
+
+    Each embedding joins the first group whose leader (first member) it is at least
+    `similarity_threshold` cosine-similar to, otherwise it starts a new group and leads it.
+    Embeddings are compared a block at a time against every leader with one matrix product.
+    Groups can be seeded from earlier runs so new embeddings extend them instead of starting over.
+    """
+    def __init__(self, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD, block_size: int = 256):
+        self.similarity_threshold = similarity_threshold
+        self.block_size = block_size
+        self._leaders: np.ndarray | None = None
+        self.num_groups = 0
+        self.group_ids: list[int] = []
+        self.next_group_id = 0
+
+    @classmethod
+    def from_leaders(cls, leaders, group_ids: list[int], next_group_id: int | None = None, **kwargs) -> "LeaderClusterer":
+        """
+        Seed a clusterer with existing groups, given each group's leader embedding in group order.
+        """
+        clusterer = cls(**kwargs)
+        if len(group_ids):
+            for vector, group_id in zip(normalize_embeddings(leaders), group_ids):
+                clusterer._add_leader(vector, int(group_id))
+        if next_group_id is not None:
+            clusterer.next_group_id = max(clusterer.next_group_id, next_group_id)
+        return clusterer
+
+    @property
+    def leaders(self) -> np.ndarray:
+        if self._leaders is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._leaders[:self.num_groups]
+
+    def _add_leader(self, vector: np.ndarray, group_id: int | None = None) -> int:
+        if self._leaders is None:
+            self._leaders = np.empty((64, vector.shape[0]), dtype=np.float32)
+        elif self.num_groups == len(self._leaders):
+            grown = np.empty((2 * len(self._leaders), self._leaders.shape[1]), dtype=np.float32)
+            grown[:self.num_groups] = self._leaders
+            self._leaders = grown
+
+        self._leaders[self.num_groups] = vector
+        self.num_groups += 1
+
+        group_id = self.next_group_id if group_id is None else group_id
+        self.group_ids.append(group_id)
+        self.next_group_id = max(self.next_group_id, group_id + 1)
+        return self.num_groups - 1
+
+    def assign(self, embeddings) -> np.ndarray:
+        """
+        Assign each embedding to a group, in order. Returns the group id of every embedding.
+        """
+        if len(embeddings) == 0:
+            return np.empty(0, dtype=np.int64)
+        vectors = normalize_embeddings(embeddings)
+        labels = np.empty(len(vectors), dtype=np.int64)
+
+        for start in tqdm(range(0, len(vectors), self.block_size), desc="Grouping complaints"):
+            block = vectors[start:start + self.block_size]
+            block_labels = labels[start:start + len(block)]
+            existing = self.num_groups
+
+            if existing:
+                hits = (block @ self.leaders.T) >= self.similarity_threshold
+                matched = hits.any(axis=1)
+                block_labels[matched] = hits[matched].argmax(axis=1)
+            else:
+                matched = np.zeros(len(block), dtype=bool)
+
+            # the rest may still join a group started earlier in this block, so they go in order
+            for i in np.flatnonzero(~matched):
+                vector = block[i]
+                if self.num_groups > existing:
+                    new_hits = (self._leaders[existing:self.num_groups] @ vector) >= self.similarity_threshold
+                    if new_hits.any():
+                        block_labels[i] = existing + int(new_hits.argmax())
+                        continue
+                block_labels[i] = self._add_leader(vector)
+
+        return np.asarray(self.group_ids, dtype=np.int64)[labels]
@@ -0,0 +1,74 @@
+from sqlalchemy import func
+from schemas.complaint_types import ComplaintCluster
+from models.models import Complaint, ComplaintSummary, first_latitude, first_longitude
+from services.group_complaints import complaint_feed_columns, group_complaints, load_summaries
+
+# grid cells per 256px map tile, so clusters are roughly 64px apart on screen at any zoom
+CELLS_PER_TILE = 4
+MAX_ZOOM = 22
+
+def cell_size(zoom: int) -> float:
+    """
+    Width of a grid cell in degrees at the given map zoom.
+    """
+    return 360 / (2 ** zoom * CELLS_PER_TILE)
+
+def mercator_y(latitude):
+    """
+    Web Mercator y of a latitude column, in the same degree units as longitude. Cells step evenly in it,
+    so they are square on the map rather than stretched north-south away from the equator.
+    """
+    return func.degrees(func.ln(func.tan(func.pi() / 4 + func.radians(latitude) / 2)))
+
+def get_complaint_clusters(db, zoom, bbox=None):
+    """
+    Aggregate complaint markers into grid cells sized for the zoom level: a count, centroid and top urgency per cell.
+    """
+    size = cell_size(zoom)
+    cell_x = func.floor(first_longitude / size).label("cell_x")
+    cell_y = func.floor(mercator_y(first_latitude) / size).label("cell_y")
+
+    query = (
+        db.query(
+            cell_x,
+            cell_y,
+            func.count().label("count"),
+            func.count(func.distinct(Complaint.group)).label("groups"),
+            func.min(Complaint.group).label("group"),
+            func.avg(first_latitude).label("latitude"),
+            func.avg(first_longitude).label("longitude"),
+            func.max(ComplaintSummary.urgency_score).label("urgency"),
+        )
+        .outerjoin(ComplaintSummary, ComplaintSummary.id == Complaint.group)
+        .filter(first_latitude.isnot(None))
+    )
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        query = query.filter(
+            first_latitude.between(min_lat, max_lat),
+            first_longitude.between(min_lon, max_lon),
+        )
+
+    return [
+        ComplaintCluster(
+            id = f"{zoom}/{int(cell.cell_x)}/{int(cell.cell_y)}",
+            coordinates = [float(cell.latitude), float(cell.longitude)],
+            count = cell.count,
+            groups = cell.groups,
+            urgency = cell.urgency,
+            group = cell.group if cell.groups == 1 else None
+        )
+        for cell in query.group_by(cell_x, cell_y).all()
+    ]
+
+def get_group_complaints(db, group):
+    """
+    The full GroupedComplaint detail for a single group, fetched when a cluster or marker is opened.
+    """
+    complaints = (
+        db.query(*complaint_feed_columns())
+        .filter(Complaint.group == group)
+        .order_by(Complaint.id)
+        .all()
+    )
+    return group_complaints(complaints, load_summaries(db, [group]), db)
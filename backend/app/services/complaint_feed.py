@@ -0,0 +1,46 @@
+import json
+import hashlib
+import threading
+from services.data_saver import get_data_version
+from services.group_complaints import get_grouped_complaints
+
+class ComplaintFeedCache:
+    """
+    Keeps the serialized GroupedComplaint feed for GET /api/complaints, rebuilt only when the complaints data version moves.
+    """
+    def __init__(self):
+        self.version = None
+        self.etag = None
+        self.body = None
+        self._lock = threading.Lock()
+
+    def get(self, db) -> tuple[str, bytes]:
+        """
+        Return the (etag, json body) of the current feed.
+        """
+        version = get_data_version(db)
+        if self.version == version:
+            return self.etag, self.body
+
+        with self._lock:
+            if self.version != version:
+                print(f"Rebuilding complaint feed for data version {version}")
+                feed = get_grouped_complaints(db)
+                body = json.dumps([complaint.model_dump() for complaint in feed]).encode()
+                self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                self.body = body
+                self.version = version
+            return self.etag, self.body
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the etag (weak comparison, as HTTP specifies for GET).
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+complaint_feed = ComplaintFeedCache()
@@ -0,0 +1,71 @@
+import numpy as np
+from psycopg2.extras import execute_values
+from sqlalchemy import text
+from models.models import Complaint, engine
+
+COMPLAINT_CHUNK_SIZE = 1000
+# embeddings are stored as raw little-endian float32 bytes: half the size of a float8[] and no per-element parsing
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+COMPLAINT_COLUMNS = ["title", "body", "url", "created_at", "is_complaint", "locations", "coordinates", "embedding", "group"]
+# "group" is a reserved word, so every column is quoted
+QUOTED_COLUMNS = ", ".join(f'"{column}"' for column in COMPLAINT_COLUMNS)
+INSERT_COMPLAINTS = (
+    f"INSERT INTO {Complaint.__tablename__} ({QUOTED_COLUMNS}) VALUES %s "
+    "ON CONFLICT (url) DO NOTHING RETURNING url"
+)
+
+def encode_embedding(vector) -> bytes:
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+def decode_embedding(data) -> np.ndarray:
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+
+def upgrade_complaints_table():
+    """
+    Bring a complaints table created before its current columns and indexes up to date; create_all only
+    covers new tables. Every statement is idempotent and touches no rows, so this is safe at API startup.
+    The url unique index needs duplicates removed first, see data_saver.migrate_complaint_urls.
+    """
+    table = Complaint.__tablename__
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS embedding bytea"))
+        # the viewport and cursor queries, see Complaint.__table_args__
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_first_coordinate ON {table} ((coordinates[1][1]), (coordinates[1][2]))"
+        ))
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_group_id ON {table} ("group", id)'))
+
+def existing_urls(db, urls) -> set[str]:
+    urls = list(urls)
+    if not urls:
+        return set()
+    return {row.url for row in db.query(Complaint.url).filter(Complaint.url.in_(urls))}
+
+def insert_complaints(db, items) -> set[str]:
+    """
+    Insert grouped complaints in one multi-row statement as part of the session's transaction.
+    Urls already in the table are skipped; returns the urls that were inserted.
+    """
+    if not items:
+        return set()
+    rows = [
+        (
+            item['title'],
+            item['body'],
+            item['url'],
+            item['created_at'],
+            item['is_complaint'],
+            list(item['locations']),
+            [list(coordinate) for coordinate in item['coordinates']],
+            encode_embedding(item['embeddings']),
+            item['group'],
+        )
+        for item in items
+    ]
+    cursor = db.connection().connection.cursor()
+    try:
+        inserted = execute_values(cursor, INSERT_COMPLAINTS, rows, page_size=len(rows), fetch=True)
+    finally:
+        cursor.close()
+    return {row[0] for row in inserted}
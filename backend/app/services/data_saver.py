@@ -1,11 +1,86 @@
-from tqdm import tqdm
-from sklearn.metrics.pairwise import cosine_similarity
-from models.models import SessionLocal, Complaint, ComplaintSummary, engine, Base
+import numpy as np
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from models.models import SessionLocal, Complaint, ComplaintSummary, DataVersion, engine, Base
 from schemas.complaint_types import GroupedComplaint
+from services.complaint_clustering import LeaderClusterer, DEFAULT_SIMILARITY_THRESHOLD
+from services.complaint_writer import COMPLAINT_CHUNK_SIZE, decode_embedding, existing_urls, insert_complaints
 
-def save_complaints(data):
+# bumped whenever complaints or their summaries change, so the cached map feed is rebuilt
+COMPLAINTS_VERSION = "complaints"
+
+def bump_data_version(db, name=COMPLAINTS_VERSION):
+    """
+    Increment a data version as part of the caller's transaction.
+    """
+    db.execute(
+        insert(DataVersion)
+        .values(name=name, version=1)
+        .on_conflict_do_update(index_elements=[DataVersion.name], set_={"version": DataVersion.version + 1})
+    )
+
+def get_data_version(db, name=COMPLAINTS_VERSION):
+    version = db.query(DataVersion.version).filter(DataVersion.name == name).scalar()
+    return version or 0
+
+def migrate_complaint_urls():
+    """
+    One-off migration for complaint tables from before urls were unique: delete duplicate urls, keeping the
+    oldest row, then add the unique index that insert_complaints upserts against. Run from ingest, not at API startup.
+    """
+    table = Complaint.__tablename__
+    db = SessionLocal()
+    try:
+        if db.execute(text(f"SELECT to_regclass('ux_{table}_url')")).scalar() is not None:
+            return
+        duplicates = db.execute(text(
+            f"DELETE FROM {table} newer USING {table} older WHERE newer.url = older.url AND newer.id > older.id"
+        ))
+        if duplicates.rowcount > 0:
+            print(f"Removed {duplicates.rowcount} duplicate complaints")
+            bump_data_version(db)
+        db.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_url ON {table} (url)"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error migrating complaint urls: {e}")
+        raise
+    finally:
+        db.close()
+
+def save_complaints(data, incremental=False, clusterer=None, chunk_size=COMPLAINT_CHUNK_SIZE):
+    """
+    Group and save processed complaints. Returns the grouped data and the ids of the groups that gained complaints.
+
+    In incremental mode new complaints are assigned to the groups already in the database,
+    and new groups are numbered after the existing ones. Passing a `clusterer` (see load_group_clusterer)
+    saves one chunk of a larger batch: it carries the groups made by earlier chunks to the next.
+
+    Complaints whose url is already saved are skipped. Each chunk of `chunk_size` items is written and
+    committed on its own, so a failure only loses the chunk it happened in.
+    """
     db = SessionLocal()
-    grouped_data = group_complaints(data)
+    try:
+        if clusterer is None:
+            clusterer = load_group_clusterer(db) if incremental else LeaderClusterer()
+
+        all_grouped = []
+        all_groups = set()
+        for start in range(0, len(data), chunk_size):
+            grouped_data, groups = save_complaint_chunk(db, data[start:start + chunk_size], clusterer)
+            all_grouped.extend(grouped_data)
+            all_groups |= groups
+        return all_grouped, all_groups
+    finally:
+        db.close()
+
+def save_complaint_chunk(db, data, clusterer):
+    saved_urls = existing_urls(db, [item['url'] for item in data])
+    data = [item for item in data if item['url'] not in saved_urls]
+    if saved_urls:
+        print(f"Skipping {len(saved_urls)} complaints that are already saved")
+
+    grouped_data = group_complaints(data, clusterer=clusterer)
     
     # filter out non-complaint data
     print(f"Total items before filtering: {len(grouped_data)}")
@@ -17,64 +92,76 @@ def save_complaints(data):
 
 
     groups = set([item['group'] for item in filtered_complaints])
+    # only groups whose summary row is already saved count as changed; the clusterer also knows groups
+    # it started in earlier chunks on items that were never saved
+    existing_groups = {
+        row.id for row in db.query(ComplaintSummary.id).filter(ComplaintSummary.id.in_(groups))
+    } if groups else set()
+    changed_groups = groups & existing_groups
+    new_groups = groups - existing_groups
 
-    summaries = [
-        ComplaintSummary(
-            id=group,
-        )
-        for group in groups
-    ]
-
-    db.bulk_save_objects(summaries)
-    db.commit()
-    
     try:
-        complaints = [
-            Complaint(
-                title=item['title'],
-                body=item['body'],
-                url=item['url'],
-                created_at=item['created_at'],
-                is_complaint=item['is_complaint'],
-                locations=item['locations'],
-                coordinates=item['coordinates'],
-                topics=item['embeddings'].tolist(),  
-                group=item['group'],
-                summary=None
+        # every group gets a summary row, not just new ones: a group the clusterer started on an item that was
+        # filtered out (in this or an earlier chunk) has none yet, and complaints reference it by foreign key
+        if groups:
+            db.execute(insert(ComplaintSummary).values([{"id": group} for group in groups]).on_conflict_do_nothing())
+        inserted = insert_complaints(db, filtered_complaints)
+
+        # existing groups that gained complaints get their summary regenerated on next request
+        if changed_groups:
+            db.query(ComplaintSummary).filter(ComplaintSummary.id.in_(changed_groups)).update(
+                {ComplaintSummary.title: None}, synchronize_session=False
             )
-            for item in filtered_complaints
-        ]
-        db.bulk_save_objects(complaints)
+        if inserted:
+            bump_data_version(db)
         db.commit()
-        print(f"Successfully saved {len(complaints)} complaints.")
+        print(f"Successfully saved {len(inserted)} complaints.")
+        print(f"New groups: {len(new_groups)}, updated groups: {sorted(changed_groups)}")
     except Exception as e:
         db.rollback()
         print(f"An error occurred during bulk saving: {e}")
-    finally:
-        db.close()
+        raise
         
-    return grouped_data
+    return grouped_data, groups
 
 
-def group_complaints(processed_data, similarity_threshold=0.69):
-    groups = []
-        
-    for item in tqdm(processed_data, desc="Grouping complaints"):
-        added_to_group = False
-        for group in groups:
-            if cosine_similarity([item['embeddings']], [group[0]['embeddings']])[0][0] >= similarity_threshold:
-                group.append(item)
-                added_to_group = True
-                break
-            
-        if not added_to_group:
-            groups.append([item])
-        
-    for i, group in enumerate(groups):
-        for item in group:
-            item['group'] = i
-        
-    return [item for group in groups for item in group]
+def load_group_clusterer(db, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD) -> LeaderClusterer:
+    """
+    Build a clusterer seeded with the saved groups, using each group's first complaint as its leader.
+    """
+    leader_rows = (
+        db.query(Complaint.group, Complaint.embedding, Complaint.topics)
+        .filter(Complaint.group.isnot(None), (Complaint.embedding.isnot(None)) | (Complaint.topics.isnot(None)))
+        .distinct(Complaint.group)
+        .order_by(Complaint.group, Complaint.id)
+        .all()
+    )
+    # new groups must not reuse an id that already has a summary row
+    max_summary_id = db.query(func.max(ComplaintSummary.id)).scalar()
+    next_group_id = max_summary_id + 1 if max_summary_id is not None else 0
+
+    print(f"Loaded {len(leader_rows)} existing group leaders")
+    return LeaderClusterer.from_leaders(
+        [decode_embedding(row.embedding) if row.embedding is not None else row.topics for row in leader_rows],
+        [row.group for row in leader_rows],
+        next_group_id=next_group_id,
+        similarity_threshold=similarity_threshold,
+    )
+
+
+def group_complaints(processed_data, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD, clusterer=None):
+    if not processed_data:
+        return []
+
+    if clusterer is None:
+        clusterer = LeaderClusterer(similarity_threshold)
+    labels = clusterer.assign([item['embeddings'] for item in processed_data])
+    for item, label in zip(processed_data, labels):
+        item['group'] = int(label)
+
+    # items come back grouped, in their original order within each group
+    order = np.argsort(labels, kind="stable")
+    return [processed_data[i] for i in order]
 
 def save_complaint_summary(complaint: GroupedComplaint, summary_data: dict):
     db = SessionLocal()
@@ -94,11 +181,16 @@ def save_complaint_summary(complaint: GroupedComplaint, summary_data: dict):
                 location = c.locations
                 break
         
+        previous = (complaint_summary.title, complaint_summary.summary, complaint_summary.urgency_score, complaint_summary.solution, complaint_summary.location)
         complaint_summary.title = summary_data['title']
         complaint_summary.summary = summary_data['summary']
         complaint_summary.urgency_score = summary_data['urgency']['score']
         complaint_summary.solution = summary_data['solutions']
         complaint_summary.location = location
+
+        # re-saving an unchanged summary (the endpoint does this for cached ones) shouldn't invalidate the feed
+        if previous != (complaint_summary.title, complaint_summary.summary, complaint_summary.urgency_score, complaint_summary.solution, complaint_summary.location):
+            bump_data_version(db)
         
         db.commit()
         print(f"Successfully saved complaint summary for group {complaint.group}")
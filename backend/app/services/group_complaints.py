@@ -1,8 +1,106 @@
 from schemas.complaint_types import GroupedComplaint, Source
 from itertools import groupby
-from models.models import SessionLocal, ComplaintSummary
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from models.models import Complaint, ComplaintSummary, first_latitude, first_longitude
+
+# sources only feed the summary prompt, which reads the first 1000 characters of each body
+SOURCE_BODY_LENGTH = 1000
+SOURCE_LIMIT = 5
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+def complaint_feed_columns():
+    """
+    The complaint columns the map feed needs: no embeddings and only the start of each body.
+    """
+    return (
+        Complaint.id,
+        Complaint.title,
+        Complaint.url,
+        func.substr(Complaint.body, 1, SOURCE_BODY_LENGTH).label("body"),
+        Complaint.locations,
+        Complaint.coordinates,
+        Complaint.group,
+    )
+
+def load_summaries(db, group_ids=None):
+    """
+    Summary text for the given groups (or all of them) in one query, keyed by group.
+    """
+    query = db.query(ComplaintSummary.id, ComplaintSummary.summary, ComplaintSummary.solution)
+    if group_ids is not None:
+        query = query.filter(ComplaintSummary.id.in_(group_ids))
+    return {summary.id: summary for summary in query}
+
+def get_grouped_complaints(db):
+    """
+    Load the projected complaints and their summaries in two queries and group them for the map.
+    """
+    complaints = db.query(*complaint_feed_columns()).order_by(Complaint.id).all()
+    return group_complaints(complaints, load_summaries(db), db)
+
+def ensure_summaries(db, group_ids):
+    """
+    Create empty summary rows for any of the groups that don't have one, in a single statement.
+    """
+    if not group_ids:
+        return
+    db.execute(
+        insert(ComplaintSummary)
+        .values([{"id": group_id} for group_id in sorted(group_ids)])
+        .on_conflict_do_nothing(index_elements=[ComplaintSummary.id])
+    )
+    db.commit()
+
+class GroupSources:
+    """
+    The sources shown for a group's complaints: the other members of the group, then the complaint itself, capped at `limit`.
+    Only the first few members of a group can appear, so only those are turned into Source objects.
+    """
+    def __init__(self, with_coords, no_coords, limit=SOURCE_LIMIT):
+        self.limit = limit
+        self.head = with_coords[:limit + 1]
+        self.tail = no_coords[:limit]
+        self.leading_ids = {c.id for c in self.head[:limit]}
+        self._sources = {}
+        self._shared = None
+
+    def _source(self, complaint):
+        if complaint.id not in self._sources:
+            self._sources[complaint.id] = Source(title=complaint.title, body=complaint.body, url=complaint.url)
+        return self._sources[complaint.id]
+
+    def for_complaint(self, complaint):
+        if complaint.id in self.leading_ids:
+            members = [c for c in self.head if c.id != complaint.id] + self.tail + [complaint]
+            return [self._source(c) for c in members[:self.limit]]
+
+        # past the first few members every list is the same: the first `limit` complaints with coordinates
+        if self._shared is None:
+            self._shared = [self._source(c) for c in self.head[:self.limit]]
+        return self._shared
+
+def build_source_lists(with_coords, no_coords, limit=SOURCE_LIMIT):
+    group_sources = GroupSources(with_coords, no_coords, limit)
+    return [group_sources.for_complaint(complaint) for complaint in with_coords]
+
+def to_grouped_complaint(complaint, sources, summary):
+    return GroupedComplaint(
+        id = f'{complaint.group}_{complaint.id}',
+        group = complaint.group,
+        coordinates = complaint.coordinates[0],
+        sources = sources,
+        location = complaint.locations[0],
+        summary = summary.summary if summary and summary.summary else "",
+        solution_outline = summary.solution if summary and summary.solution else ""
+    )
+
+def group_complaints(complaints, summaries, db):
+    missing_groups = {c.group for c in complaints if c.coordinates and c.group not in summaries}
+    ensure_summaries(db, missing_groups)
 
-def group_complaints(complaints):
     def group_key(complaint):
         return complaint.group
 
@@ -10,41 +108,102 @@ def group_complaints(complaints):
         with_coords = [c for c in group if c.coordinates]
         no_coords = [c for c in group if not c.coordinates]
 
-        result = []
-        for complaint in with_coords:
-            nearby = [c for c in with_coords if c != complaint]
-
-            all_sources = [Source(title=c.title, body=c.body, url=c.url) for c in nearby + no_coords + [complaint]]
-            sources = all_sources[:5]
-
-            db = SessionLocal()
-            summary = db.query(ComplaintSummary).filter(ComplaintSummary.id == complaint.group).first()
-
-            if not summary:
-                summary = ComplaintSummary(id = complaint.group)
-                db.add(summary)
-                db.commit()
-            db.close()
-
-            result.append(
-                GroupedComplaint(
-                    id = f'{summary.id}_{complaint.id}',
-                    group = summary.id,
-                    coordinates = complaint.coordinates[0],
-                    sources = sources,
-                    location = complaint.locations[0],
-                    summary = summary.summary if summary.summary else "",
-                    solution_outline = summary.solution if summary.solution else ""
-                )
-            )
-
+        summary = summaries.get(group[0].group)
+        result = [
+            to_grouped_complaint(complaint, sources, summary)
+            for complaint, sources in zip(with_coords, build_source_lists(with_coords, no_coords))
+        ]
         return result
-        
+
     sorted_complaints = sorted(complaints, key=group_key)
     grouped = groupby(sorted_complaints, key=group_key)
 
     return [
-        complaint 
+        complaint
         for _,group in grouped
         for complaint in merge_complaints(list(group))
     ]
+
+def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """
+    Parse a "minLon,minLat,maxLon,maxLat" viewport.
+    """
+    parts = bbox.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in parts)
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed its maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    """
+    A cursor is the id of the last GroupedComplaint on the previous page: "<group>_<complaint id>".
+    """
+    group, _, complaint_id = cursor.partition("_")
+    try:
+        return int(group), int(complaint_id)
+    except ValueError:
+        raise ValueError("invalid cursor")
+
+def load_group_heads(db, group_ids):
+    """
+    The first few members of each group, with and without coordinates: all GroupSources needs to build their source lists.
+    """
+    has_coords = first_latitude.isnot(None)
+    position = func.row_number().over(
+        partition_by=(Complaint.group, has_coords),
+        order_by=Complaint.id,
+    ).label("position")
+    ranked = (
+        db.query(*complaint_feed_columns(), has_coords.label("has_coords"), position)
+        .filter(Complaint.group.in_(group_ids))
+        .subquery()
+    )
+    rows = (
+        db.query(ranked)
+        .filter(ranked.c.position <= SOURCE_LIMIT + 1)
+        .order_by(ranked.c.group, ranked.c.id)
+        .all()
+    )
+
+    heads = {group_id: ([], []) for group_id in group_ids}
+    for row in rows:
+        with_coords, no_coords = heads[row.group]
+        (with_coords if row.has_coords else no_coords).append(row)
+    return heads
+
+def get_grouped_complaints_page(db, bbox=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the map feed, in feed order, optionally limited to complaints inside a viewport.
+    Returns the grouped complaints and the cursor of the next page (None on the last page).
+    """
+    query = db.query(*complaint_feed_columns()).filter(first_latitude.isnot(None))
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        query = query.filter(
+            first_latitude.between(min_lat, max_lat),
+            first_longitude.between(min_lon, max_lon),
+        )
+    if cursor is not None:
+        query = query.filter(tuple_(Complaint.group, Complaint.id) > tuple_(*cursor))
+
+    rows = query.order_by(Complaint.group, Complaint.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+
+    group_ids = {row.group for row in rows}
+    summaries = load_summaries(db, group_ids)
+    ensure_summaries(db, group_ids - summaries.keys())
+    group_sources = {
+        group_id: GroupSources(with_coords, no_coords)
+        for group_id, (with_coords, no_coords) in load_group_heads(db, group_ids).items()
+    }
+
+    page = [
+        to_grouped_complaint(row, group_sources[row.group].for_complaint(row), summaries.get(row.group))
+        for row in rows
+    ]
+    return page, page[-1].id if has_more else None
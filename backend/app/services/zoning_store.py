@@ -0,0 +1,185 @@
+import os
+import pickle
+import threading
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.geometry import Point
+import geopandas as gpd
+
+ZONING_GEOJSON_PATH = "backend/data/Zoning Area 4326.geojson"
+ZONING_CACHE_PATH = "backend/data/zoning_cache.pkl"
+ZONING_CACHE_VERSION = 1
+
+# output key -> column in the Toronto zoning layer
+ZONING_COLUMNS = {
+    "zone_type": "ZN_ZONE",
+    "bylaw_chapter": "ZBL_CHAPT",
+    "bylaw_section": "ZBL_SECTN",
+    "bylaw_exception": "ZBL_EXCPTN",
+}
+
+# fallback used when a point does not fall inside any zoning polygon
+DEFAULT_ZONING = {
+    "zone_type": "CR",
+    "bylaw_chapter": "40",
+    "bylaw_section": "40.10",
+    "bylaw_exception": "",
+}
+
+class ZoningStore:
+    """
+    Read-only zoning polygons with a prepared STRtree index, shared by every agent and request.
+    """
+    def __init__(self, geometries: np.ndarray, attributes: dict[str, np.ndarray]):
+        # the STRtree narrows each lookup down to the polygons whose bounding box holds the point,
+        # and preparing the geometries makes the exact contains check on those candidates cheap
+        self.geometries = geometries
+        shapely.prepare(self.geometries)
+        self.spatial_index = STRtree(self.geometries)
+
+        self.attributes = attributes
+        self.geometries.flags.writeable = False
+        for values in self.attributes.values():
+            values.flags.writeable = False
+
+    def __len__(self):
+        return len(self.geometries)
+
+    @property
+    def total_bounds(self) -> np.ndarray:
+        return shapely.total_bounds(self.geometries)
+
+    @classmethod
+    def from_geojson(cls, path: str = ZONING_GEOJSON_PATH) -> "ZoningStore":
+        zoning_data = gpd.read_file(path)
+        geometries = zoning_data.geometry.values.to_numpy()
+        attributes = {
+            key: np.array(zoning_data[column].tolist(), dtype=object)
+            for key, column in ZONING_COLUMNS.items()
+        }
+        return cls(geometries, attributes)
+
+    @classmethod
+    def from_cache(cls, path: str = ZONING_CACHE_PATH, source_path: str = ZONING_GEOJSON_PATH) -> "ZoningStore | None":
+        """
+        Load the store from the WKB cache, or return None if the cache is missing or stale.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("version") != ZONING_CACHE_VERSION or cached.get("source") != _source_stamp(source_path):
+            return None
+        return cls(shapely.from_wkb(cached["wkb"]), cached["attributes"])
+
+    def save_cache(self, path: str = ZONING_CACHE_PATH, source_path: str = ZONING_GEOJSON_PATH):
+        cached = {
+            "version": ZONING_CACHE_VERSION,
+            "source": _source_stamp(source_path),
+            "wkb": shapely.to_wkb(self.geometries),
+            "attributes": self.attributes,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def find_zone(self, point: Point) -> int | None:
+        """
+        Return the row of the first zoning polygon containing the point, or None.
+        """
+        candidates = self.spatial_index.query(point)
+        if len(candidates) == 0:
+            return None
+
+        # sort so overlapping polygons resolve to the same row a linear scan would pick
+        candidates.sort()
+        matches = candidates[shapely.contains(self.geometries[candidates], point)]
+        if len(matches) == 0:
+            return None
+        return int(matches[0])
+
+    def find_zones(self, points: np.ndarray) -> np.ndarray:
+        """
+        Resolve many points in one bulk index query. Returns the matching row per point, or -1 for misses.
+        """
+        rows = np.full(len(points), -1, dtype=np.intp)
+        point_idx, zone_idx = self.spatial_index.query(points)
+        if len(point_idx) == 0:
+            return rows
+
+        hits = shapely.contains(self.geometries[zone_idx], points[point_idx])
+        point_idx, zone_idx = point_idx[hits], zone_idx[hits]
+
+        # keep the lowest zone row per point, same as the single point lookup
+        order = np.lexsort((zone_idx, point_idx))
+        point_idx, zone_idx = point_idx[order], zone_idx[order]
+        first_points, first = np.unique(point_idx, return_index=True)
+        rows[first_points] = zone_idx[first]
+        return rows
+
+    def zone_info(self, row: int) -> dict:
+        return {key: values[row] for key, values in self.attributes.items()}
+
+    def lookup(self, location: list[float]) -> dict | None:
+        """
+        Zoning for a [lat, lon] location, or None if no polygon contains it.
+        """
+        row = self.find_zone(Point(location[1], location[0]))
+        return self.zone_info(row) if row is not None else None
+
+    def lookup_many(self, locations: list[list[float]]) -> list[dict]:
+        """
+        Zoning for many [lat, lon] locations in input order, falling back to the default zoning on misses.
+        """
+        if not locations:
+            return []
+        points = shapely.points([[location[1], location[0]] for location in locations])
+        rows = self.find_zones(points)
+        return [
+            self.zone_info(int(row)) if row >= 0 else dict(DEFAULT_ZONING)
+            for row in rows
+        ]
+
+
+def _source_stamp(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return (stat.st_size, int(stat.st_mtime))
+
+
+def load_zoning_store(path: str = ZONING_GEOJSON_PATH, cache_path: str = ZONING_CACHE_PATH) -> ZoningStore:
+    """
+    Load the zoning store from the on-disk cache, parsing the GeoJSON (and refreshing the cache) only when needed.
+    """
+    try:
+        store = ZoningStore.from_cache(cache_path, path)
+    except Exception as e:
+        print(f"Error reading zoning cache: {e}")
+        store = None
+    if store is not None:
+        print(f"Loaded {len(store)} zoning polygons from cache")
+        return store
+
+    store = ZoningStore.from_geojson(path)
+    print(f"Loaded {len(store)} zoning polygons from {path}")
+    try:
+        store.save_cache(cache_path, path)
+    except Exception as e:
+        print(f"Error writing zoning cache: {e}")
+    return store
+
+
+_zoning_store: ZoningStore | None = None
+_zoning_store_lock = threading.Lock()
+
+def get_zoning_store() -> ZoningStore:
+    """
+    The process-wide zoning store, loaded on first use.
+    """
+    global _zoning_store
+    if _zoning_store is None:
+        with _zoning_store_lock:
+            if _zoning_store is None:
+                _zoning_store = load_zoning_store()
+    return _zoning_store
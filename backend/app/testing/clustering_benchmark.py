@@ -0,0 +1,56 @@
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from services.complaint_clustering import LeaderClusterer, DEFAULT_SIMILARITY_THRESHOLD
+
+# run from the repository root: python backend/app/testing/clustering_benchmark.py
+
+def synthetic_embeddings(n, dim=768, topics=None, seed=0):
+    """
+    Embeddings scattered around a fixed set of topic directions, like posts about recurring issues.
+    """
+    rng = np.random.default_rng(seed)
+    topics = topics or max(10, n // 20)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    assignments = rng.integers(0, topics, size=n)
+    return centers[assignments] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+def original_group_labels(embeddings, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    The original grouping loop: one 1x1 cosine_similarity call per (item, group) pair.
+    """
+    leaders = []
+    labels = []
+    for embedding in embeddings:
+        for i, leader in enumerate(leaders):
+            if cosine_similarity([embedding], [leader])[0][0] >= similarity_threshold:
+                labels.append(i)
+                break
+        else:
+            leaders.append(embedding)
+            labels.append(len(leaders) - 1)
+    return np.array(labels)
+
+def run_clustering_benchmark(sizes=(1_000, 10_000, 100_000), baseline_max=1_000):
+    for n in sizes:
+        embeddings = synthetic_embeddings(n)
+
+        start = time.perf_counter()
+        clusterer = LeaderClusterer()
+        labels = clusterer.assign(embeddings)
+        elapsed = time.perf_counter() - start
+        print(f"n={n:>7}: {elapsed:8.2f}s batched, {clusterer.num_groups} groups, {n / elapsed:,.0f} items/s")
+
+        if n <= baseline_max:
+            start = time.perf_counter()
+            baseline = original_group_labels(embeddings)
+            baseline_elapsed = time.perf_counter() - start
+            same = np.array_equal(baseline, labels)
+            print(f"           {baseline_elapsed:8.2f}s original loop, identical labels: {same}")
+
+if __name__ == "__main__":
+    run_clustering_benchmark()
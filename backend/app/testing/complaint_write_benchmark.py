@@ -0,0 +1,93 @@
+import sys
+import time
+import uuid
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import func
+from models.models import Base, SessionLocal, Complaint, ComplaintSummary, engine
+from services.data_saver import migrate_complaint_urls
+from services.complaint_writer import COMPLAINT_CHUNK_SIZE, insert_complaints, upgrade_complaints_table
+
+# run against a local Postgres: python backend/app/testing/complaint_write_benchmark.py
+# rows are written under a throwaway group and url prefix, and deleted afterwards
+
+def synthetic_complaints(n, prefix, group, dim=768, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        yield {
+            "title": f"Complaint {i}",
+            "body": "The streetcar short-turned again and the stop was full. " * 20,
+            "url": f"{prefix}{i}",
+            "created_at": time.time(),
+            "is_complaint": True,
+            "locations": ["Queen Street West"],
+            "coordinates": [(43.64 + rng.random() / 100, -79.40 + rng.random() / 100)],
+            "embeddings": rng.standard_normal(dim).astype(np.float32),
+            "group": group,
+        }
+
+def chunked(items, size=COMPLAINT_CHUNK_SIZE):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def orm_write(db, chunk):
+    """
+    The previous writer: ORM objects with the embedding as a float8[] list.
+    """
+    db.bulk_save_objects([
+        Complaint(
+            title=item['title'],
+            body=item['body'],
+            url=item['url'],
+            created_at=item['created_at'],
+            is_complaint=item['is_complaint'],
+            locations=item['locations'],
+            coordinates=[list(coordinate) for coordinate in item['coordinates']],
+            topics=item['embeddings'].tolist(),
+            group=item['group'],
+        )
+        for item in chunk
+    ])
+
+def time_writer(write, n, group, label):
+    prefix = f"benchmark://{uuid.uuid4().hex}/"
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for chunk in chunked(synthetic_complaints(n, prefix, group)):
+            write(db, chunk)
+            db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {n:,} rows in {elapsed:.1f}s, {n / elapsed:,.0f} rows/s")
+    finally:
+        db.query(Complaint).filter(Complaint.url.like(f"{prefix}%")).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+def run_complaint_write_benchmark(n=100_000, baseline_n=10_000):
+    Base.metadata.create_all(bind=engine)
+    upgrade_complaints_table()
+    migrate_complaint_urls()
+
+    db = SessionLocal()
+    group = (db.query(func.max(ComplaintSummary.id)).scalar() or 0) + 1
+    db.add(ComplaintSummary(id=group))
+    db.commit()
+    try:
+        time_writer(orm_write, baseline_n, group, "ORM bulk_save_objects, float8[] topics")
+        time_writer(insert_complaints, n, group, "execute_values upsert, float32 bytea")
+    finally:
+        db.query(ComplaintSummary).filter(ComplaintSummary.id == group).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    run_complaint_write_benchmark()
@@ -0,0 +1,64 @@
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+from schemas.complaint_types import Source
+from services.group_complaints import build_source_lists, group_complaints
+
+# run from the repository root: python backend/app/testing/grouping_benchmark.py
+
+def synthetic_group(size, group=0, coords_ratio=0.8):
+    return [
+        SimpleNamespace(
+            id=i,
+            group=group,
+            title=f"Complaint {i}",
+            body="Lorem ipsum dolor sit amet. " * 40,
+            url=f"https://example.com/{i}",
+            locations=["Bloor Street"],
+            coordinates=[[43.66, -79.40]] if i < size * coords_ratio else [],
+        )
+        for i in range(size)
+    ]
+
+def original_source_lists(with_coords, no_coords):
+    """
+    The original construction: a Source for every member of the group, for every member.
+    """
+    source_lists = []
+    for complaint in with_coords:
+        nearby = [c for c in with_coords if c != complaint]
+        all_sources = [Source(title=c.title, body=c.body, url=c.url) for c in nearby + no_coords + [complaint]]
+        source_lists.append(all_sources[:5])
+    return source_lists
+
+def run_grouping_benchmark(size=5_000):
+    complaints = synthetic_group(size)
+    with_coords = [c for c in complaints if c.coordinates]
+    no_coords = [c for c in complaints if not c.coordinates]
+
+    start = time.perf_counter()
+    original = original_source_lists(with_coords, no_coords)
+    original_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = build_source_lists(with_coords, no_coords)
+    shared_time = time.perf_counter() - start
+
+    same = all(
+        [s.url for s in a] == [s.url for s in b]
+        for a, b in zip(original, shared)
+    )
+    print(f"{size}-member group, {len(with_coords)} with coordinates")
+    print(f"Original source lists: {original_time:.2f}s")
+    print(f"Shared source lists:   {shared_time * 1000:.2f}ms ({original_time / shared_time:,.0f}x), identical: {same}")
+
+    start = time.perf_counter()
+    summaries = {0: SimpleNamespace(id=0, summary="summary", solution="solution")}
+    group_complaints(complaints, summaries, db=None)
+    print(f"Full group_complaints: {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    run_grouping_benchmark()
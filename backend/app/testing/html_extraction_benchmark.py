@@ -0,0 +1,64 @@
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import requests
+from bs4 import BeautifulSoup
+from utils.data_scraping.html_text import extract_text, parse_html
+
+# run from the repository root: python backend/app/testing/html_extraction_benchmark.py [pages_dir]
+# pages_dir holds saved .html pages; if it's empty, a few toronto.ca pages are downloaded into it first
+
+PAGES_DIR = "backend/data/html_samples"
+SAMPLE_URLS = [
+    "https://www.toronto.ca/city-government/data-research-maps/research-reports/",
+    "https://www.toronto.ca/city-government/data-research-maps/neighbourhoods-communities/neighbourhood-profiles/",
+    "https://www.toronto.ca/city-government/planning-development/zoning-by-law-preliminary-zoning-reviews/",
+    "https://www.toronto.ca/services-payments/streets-parking-transportation/",
+]
+
+def save_sample_pages(pages_dir):
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    for i, url in enumerate(SAMPLE_URLS):
+        response = requests.get(url, timeout=15)
+        response.raise_for_status()
+        (pages_dir / f"toronto_{i}.html").write_bytes(response.content)
+
+def original_extract(content, max_text_length=6000):
+    """
+    TorontoScraper's original extraction: every p, li, h1 and div, through html.parser, then truncated.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    text = " ".join([p.get_text() for p in soup.find_all('p')])
+    text += " ".join([li.get_text() for li in soup.find_all('li')])
+    text += " ".join([h1.get_text() for h1 in soup.find_all('h1')])
+    text += " ".join([div.get_text() for div in soup.find_all('div')])
+    return text[:max_text_length]
+
+def time_per_page(extract, pages, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        texts = [extract(page) for page in pages]
+    return (time.perf_counter() - start) / (repeat * len(pages)), texts
+
+def run_html_extraction_benchmark(pages_dir=PAGES_DIR):
+    pages_dir = Path(pages_dir)
+    if not list(pages_dir.glob("*.html")):
+        save_sample_pages(pages_dir)
+    paths = sorted(pages_dir.glob("*.html"))
+    pages = [path.read_bytes() for path in paths]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KiB average")
+
+    original_time, original_texts = time_per_page(original_extract, pages)
+    lxml_time, lxml_texts = time_per_page(lambda page: extract_text(parse_html(page)), pages)
+    print(f"html.parser p/li/h1/div: {original_time * 1000:8.1f} ms/page")
+    print(f"lxml single walk:        {lxml_time * 1000:8.1f} ms/page ({original_time / lxml_time:.1f}x)")
+
+    for path, original, text in zip(paths, original_texts, lxml_texts):
+        print(f"\n{path.name}: {len(original)} chars before, {len(text)} chars after")
+        print(f"  before: {' '.join(original.split())[:200]}")
+        print(f"  after:  {text[:200]}")
+
+if __name__ == "__main__":
+    run_html_extraction_benchmark(sys.argv[1] if len(sys.argv) > 1 else PAGES_DIR)
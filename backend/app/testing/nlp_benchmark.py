@@ -0,0 +1,48 @@
+import sys
+import time
+import json
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.data_scraping.data_processor import load_nlp
+
+# run from the repository root: python backend/app/testing/nlp_benchmark.py [posts.json]
+# posts.json is a list of {"title", "body"} dicts, e.g. saved RedditScraper output
+
+SAMPLE_POSTS = [
+    {"title": "Streetcar short-turning again", "body": "The 504 short-turned at Dufferin and Queen West for the third time this week, everyone had to walk to Roncesvalles."},
+    {"title": "Pothole on Bathurst", "body": "There's a huge pothole near Bathurst Street and Bloor that's been there since March. Reported it to 311 twice."},
+    {"title": "Noise from construction", "body": "Construction at Yonge and Eglinton starts at 6am every day. Is that even allowed under the noise bylaw?"},
+    {"title": "Trinity Bellwoods is packed", "body": "Garbage everywhere in Trinity Bellwoods Park after the weekend, the bins near Queen Street are always overflowing."},
+]
+
+def load_texts(path=None, n=400):
+    posts = json.load(open(path)) if path else SAMPLE_POSTS
+    texts = [f"{post['title']} {post['body']}" for post in posts]
+    return (texts * (n // len(texts) + 1))[:n]
+
+def entities(doc):
+    return [(ent.text, ent.label_) for ent in doc.ents]
+
+def run_nlp_benchmark(texts, models=("en_core_web_sm", "en_core_web_trf"), batch_sizes=(32, 128), processes=(1, 2)):
+    for model in models:
+        full = load_nlp(model, full_pipeline=True)
+        start = time.perf_counter()
+        baseline = [entities(full(text)) for text in texts]
+        elapsed = time.perf_counter() - start
+        print(f"{model}: {len(texts) / elapsed:8.1f} docs/s one at a time, full pipeline")
+
+        nlp = load_nlp(model)
+        print(f"{model}: enabled pipes {nlp.pipe_names}")
+        for batch_size in batch_sizes:
+            for n_process in processes:
+                start = time.perf_counter()
+                batched = [entities(doc) for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)]
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{model}: {len(texts) / elapsed:8.1f} docs/s nlp.pipe batch_size={batch_size} n_process={n_process}, "
+                    f"identical entities: {batched == baseline}"
+                )
+
+if __name__ == "__main__":
+    run_nlp_benchmark(load_texts(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,48 @@
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import undefer
+from models.models import SessionLocal, Complaint
+from services.group_complaints import complaint_feed_columns
+
+# run against a database holding at least `limit` complaints: python backend/app/testing/payload_benchmark.py
+
+def value_size(value):
+    """
+    Rough in-memory payload of a fetched value: characters for strings, 8 bytes per float.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(v) for v in value)
+    return 8
+
+def run_payload_benchmark(limit=10_000):
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        full_rows = db.query(Complaint).options(undefer(Complaint.body), undefer(Complaint.topics)).order_by(Complaint.id).limit(limit).all()
+        full_time = time.perf_counter() - start
+        full_size = sum(
+            value_size(getattr(row, column.key))
+            for row in full_rows
+            for column in Complaint.__table__.columns
+        )
+
+        start = time.perf_counter()
+        projected_rows = db.query(*complaint_feed_columns()).order_by(Complaint.id).limit(limit).all()
+        projected_time = time.perf_counter() - start
+        projected_size = sum(value_size(value) for row in projected_rows for value in row)
+    finally:
+        db.close()
+
+    print(f"Rows: {len(full_rows)}")
+    print(f"Full ORM rows:  {full_size / 1e6:8.2f} MB in {full_time:.2f}s")
+    print(f"Projected rows: {projected_size / 1e6:8.2f} MB in {projected_time:.2f}s")
+
+if __name__ == "__main__":
+    run_payload_benchmark()
@@ -0,0 +1,92 @@
+import sys
+import time
+import uuid
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+from models.models import engine, Complaint, ComplaintSummary
+from services.group_complaints import get_grouped_complaints
+
+# run against the configured database: python backend/app/testing/test_complaint_queries.py
+# the test data is written in a transaction that is rolled back, so the database is left as it was
+
+# complaints, their summaries, and at most one insert for missing summary rows
+MAX_COMPLAINT_QUERIES = 3
+
+def capture_statements(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, statements
+
+def seed_complaints(db, groups=4, per_group=25, summarized=3):
+    """
+    Add `per_group` complaints to each of `groups` new groups, every fifth without coordinates.
+    Only the first `summarized` groups get a summary row. Returns the new group ids.
+    """
+    first = max(
+        db.query(func.max(ComplaintSummary.id)).scalar() or 0,
+        db.query(func.max(Complaint.group)).scalar() or 0,
+    ) + 1
+    group_ids = list(range(first, first + groups))
+    db.add_all([ComplaintSummary(id=group, summary=f"Summary {group}", solution="Fix it") for group in group_ids[:summarized]])
+
+    prefix = f"test://{uuid.uuid4().hex}/"
+    db.add_all([
+        Complaint(
+            title=f"Complaint {group}-{i}",
+            body="The sidewalk on this block has been torn up for months. " * 10,
+            url=f"{prefix}{group}/{i}",
+            created_at=time.time(),
+            is_complaint=True,
+            locations=["Dundas Street West"],
+            coordinates=[[43.65 + i / 10000, -79.40]] if i % 5 else [],
+            group=group,
+        )
+        for group in group_ids
+        for i in range(per_group)
+    ])
+    db.flush()
+    return group_ids
+
+def test_get_complaints_query_count():
+    connection = engine.connect()
+    transaction = connection.begin()
+    # the session joins the outer transaction, so the summary insert's commit is rolled back with it
+    db = Session(bind=connection)
+    try:
+        # summary rows exist for every group under the foreign key, so it is dropped for the test (and restored by the
+        # rollback) to seed the groups from before it that have none
+        for name in connection.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+        ), {"table": Complaint.__tablename__}).scalars().all():
+            connection.execute(text(f'ALTER TABLE {Complaint.__tablename__} DROP CONSTRAINT "{name}"'))
+
+        # the statement count must not grow with the number of complaints or groups
+        for per_group in (5, 50):
+            group_ids = seed_complaints(db, per_group=per_group)
+            unsummarized = group_ids[-1]
+
+            grouped, statements = capture_statements(lambda: get_grouped_complaints(db))
+
+            print(f"{len(grouped)} grouped complaints in {len(statements)} queries")
+            assert len(statements) <= MAX_COMPLAINT_QUERIES, "\n\n".join(statements)
+            assert {complaint.group for complaint in grouped} >= set(group_ids), "seeded groups missing from the feed"
+            assert db.query(ComplaintSummary.id).filter(ComplaintSummary.id == unsummarized).scalar() == unsummarized, \
+                "missing summary row was not created"
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+if __name__ == "__main__":
+    test_get_complaints_query_count()
@@ -0,0 +1,60 @@
+import sys
+import time
+import random
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import geopandas as gpd
+from shapely.geometry import shape, Point
+from services.zoning_store import ZONING_GEOJSON_PATH, load_zoning_store
+
+# run from the repository root: python backend/app/testing/zoning_benchmark.py
+
+def linear_scan(zoning_data, location):
+    """
+    The original lookup: walk every zoning polygon until one contains the point.
+    """
+    point = Point(location[1], location[0])
+    for _, zone in zoning_data.iterrows():
+        if shape(zone.geometry).contains(point):
+            return zone["ZN_ZONE"]
+    return None
+
+def run_zoning_benchmark(num_points=200, seed=0):
+    zoning_data = gpd.read_file(ZONING_GEOJSON_PATH)
+
+    start = time.perf_counter()
+    store = load_zoning_store()
+    load_time = time.perf_counter() - start
+    min_lon, min_lat, max_lon, max_lat = store.total_bounds
+
+    rng = random.Random(seed)
+    locations = [
+        [rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)]
+        for _ in range(num_points)
+    ]
+
+    start = time.perf_counter()
+    linear_results = [linear_scan(zoning_data, location) for location in locations]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed_results = []
+    for location in locations:
+        zone_info = store.lookup(location)
+        indexed_results.append(zone_info["zone_type"] if zone_info else None)
+    indexed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.lookup_many(locations)
+    batch_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(linear_results, indexed_results) if a != b)
+    print(f"Zoning polygons: {len(store)} (store loaded in {load_time:.2f}s)")
+    print(f"Linear scan:   {linear_time / num_points * 1000:.3f} ms/lookup")
+    print(f"STRtree index: {indexed_time / num_points * 1000:.3f} ms/lookup")
+    print(f"Batch lookup:  {batch_time / num_points * 1000:.3f} ms/lookup")
+    print(f"Speedup: {linear_time / indexed_time:.1f}x, mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    run_zoning_benchmark()
@@ -0,0 +1,130 @@
+import os
+import glob
+from collections import OrderedDict, defaultdict
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CHECKPOINT_DIR = "backend/data/pipeline"
+CACHED_PARTS = 4
+
+SENTIMENT = pa.struct([("neg", pa.float64()), ("neu", pa.float64()), ("pos", pa.float64()), ("compound", pa.float64())])
+
+STAGE_SCHEMAS = {
+    # scraped posts and link pages, before any NLP
+    "raw": pa.schema([
+        ("url", pa.string()),
+        ("source", pa.string()), # "reddit" or "website", which decides the spaCy model
+        ("title", pa.string()),
+        ("body", pa.string()),
+        ("created", pa.float64()),
+    ]),
+    # Processor output minus the embeddings
+    "processed": pa.schema([
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("body", pa.string()),
+        ("created_at", pa.float64()),
+        ("is_complaint", pa.bool_()),
+        ("sentiment", SENTIMENT),
+        ("locations", pa.list_(pa.string())),
+        ("coordinates", pa.list_(pa.list_(pa.float64()))),
+    ]),
+    "embeddings": pa.schema([
+        ("url", pa.string()),
+        ("embedding", pa.list_(pa.float32())),
+    ]),
+    # urls written to the database
+    "saved": pa.schema([
+        ("url", pa.string()),
+    ]),
+}
+
+class StageCheckpoint:
+    """
+    The items one ingest stage has finished, stored as Parquet part files under CHECKPOINT_DIR/<stage> and keyed by url.
+
+    Every write adds a part, so a stage that dies halfway keeps what it wrote, and the urls in `done` tell the
+    next run what to skip. `done` maps each url to its part, so single records can be fetched without
+    reading the whole stage.
+    """
+    def __init__(self, stage: str, directory: str = CHECKPOINT_DIR):
+        self.stage = stage
+        self.schema = STAGE_SCHEMAS[stage]
+        self.directory = os.path.join(directory, stage)
+        os.makedirs(self.directory, exist_ok=True)
+        self.done: dict[str, str] = {}
+        for path in self.parts():
+            for url in pq.read_table(path, columns=["url"]).column("url").to_pylist():
+                self.done.setdefault(url, path)
+        self._part_cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.done)
+
+    def parts(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+    def read(self, columns: list[str] | None = None) -> pa.Table:
+        schema = pa.schema([self.schema.field(name) for name in columns]) if columns else self.schema
+        tables = [pq.read_table(path, columns=columns) for path in self.parts()]
+        return pa.concat_tables(tables) if tables else schema.empty_table()
+
+    def records(self, exclude=()):
+        """
+        Yield stored records as dicts, one part at a time, skipping urls in `exclude`.
+        """
+        for path in self.parts():
+            for record in self._read_part(path):
+                if record["url"] not in exclude:
+                    yield record
+
+    def _read_part(self, path: str) -> list[dict]:
+        if path in self._part_cache:
+            self._part_cache.move_to_end(path)
+            return self._part_cache[path]
+        records = pq.read_table(path).to_pylist()
+        self._part_cache[path] = records
+        if len(self._part_cache) > CACHED_PARTS:
+            self._part_cache.popitem(last=False)
+        return records
+
+    def get_many(self, urls) -> dict[str, dict]:
+        """
+        Stored records for the given urls, by url. Only the parts holding them are read.
+        """
+        wanted = defaultdict(set)
+        for url in urls:
+            if url in self.done:
+                wanted[self.done[url]].add(url)
+        found = {}
+        for path, part_urls in wanted.items():
+            for record in self._read_part(path):
+                if record["url"] in part_urls:
+                    found[record["url"]] = record
+        return found
+
+    def write(self, records):
+        """
+        Append records as a new part. Records whose url is already stored are dropped.
+        """
+        new = {}
+        for record in records:
+            if record["url"] not in self.done and record["url"] not in new:
+                new[record["url"]] = record
+        if not new:
+            return 0
+
+        table = pa.Table.from_pylist(list(new.values()), schema=self.schema)
+        path = os.path.join(self.directory, f"part-{len(self.parts()):05d}.parquet")
+        # written under a temporary name first so a crash never leaves a truncated part behind
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.done.update(dict.fromkeys(new, path))
+        return len(new)
+
+    def clear(self):
+        for path in self.parts():
+            os.remove(path)
+        self.done = {}
+        self._part_cache.clear()
+
@@ -6,51 +6,89 @@ from nltk.corpus import stopwords
 from nltk.sentiment import SentimentIntensityAnalyzer
 from sentence_transformers import SentenceTransformer
 from sumy.summarizers.lsa import LsaSummarizer
-from geopy.geocoders import Nominatim
+from utils.geocoding.geocode_cache import CachedGeocoder
+from utils.data_scraping.embedding_store import EmbeddingStore
 from tqdm import tqdm
 import re
+import time
 from .toronto_scraper import TorontoScraper
 
+# only doc.ents is read; the embedding layer NER listens to stays on, the other pipes are switched off
+NLP_PIPES = ("transformer", "tok2vec", "ner")
+IGNORED_LOCATIONS = ["toronto", "ontario", "canada"]
+EMBEDDING_MODEL = 'nomic-ai/nomic-embed-text-v1'
+EMBEDDING_CHUNK_SIZE = 512 # texts held back per embedding pass; sorting by length happens within a chunk
+
+def load_nlp(model: str, full_pipeline: bool = False):
+    nlp = spacy.load(model)
+    if not full_pipeline:
+        nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in NLP_PIPES])
+    return nlp
+
 class Processor:
     """
     Processes data from the websites and Reddit to extract complaints and other metadata about the posts.
+
+    Texts go through spaCy with nlp.pipe in batches of `batch_size`, split over `n_process` processes, and
+    are embedded `embedding_batch_size` at a time as unit vectors of `embedding_dtype` (float32 or float16).
+    Embeddings are kept in an EmbeddingStore, so text seen on an earlier run isn't encoded again.
     """
-    def __init__(self):
+    def __init__(self, batch_size: int = 64, n_process: int = 1, embedding_batch_size: int = 32, embedding_dtype: str = "float32"):
         load_dotenv()
 
-        self.nlp_reddit = spacy.load("en_core_web_trf")
-        self.nlp_website = spacy.load("en_core_web_sm")
+        self.nlp_reddit = load_nlp("en_core_web_trf")
+        self.nlp_website = load_nlp("en_core_web_sm")
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_dtype = np.dtype(embedding_dtype)
 
         nltk.download('vader_lexicon')
         nltk.download('stopwords')
         nltk.download('punkt')
         self.sia = SentimentIntensityAnalyzer()
-        self.sentence_model = SentenceTransformer('nomic-ai/nomic-embed-text-v1', trust_remote_code=True)
+        self.sentence_model = SentenceTransformer(EMBEDDING_MODEL, trust_remote_code=True)
+        self.embedding_store = EmbeddingStore(
+            EMBEDDING_MODEL, self.sentence_model.get_sentence_embedding_dimension(), dtype=self.embedding_dtype.name
+        )
         self.summarizer = LsaSummarizer()
         self.stopwords = set(stopwords.words("english"))
 
-        self.geolocator = Nominatim(user_agent="myapp")
+        self.geocoder = CachedGeocoder(user_agent="myapp")
 
     def get_coordinates(self, location):
-        try:
-            location = self.geolocator.geocode(f"{location}, Toronto, Ontario, Canada")
-            if location:
-                return (location.latitude, location.longitude)
-        except:
-            pass
-        return None
+        return self.geocoder.geocode(f"{location}, Toronto, Ontario, Canada")
 
-    def process_text(self, text, nlp):
-        if not isinstance(text, str):
-            text = str(text)  
+    def embed(self, texts) -> np.ndarray:
+        """
+        Normalized vectors for texts, one row per text in input order. Stored texts are read from the embedding
+        store; the rest are encoded in batches cut from them sorted by length, so each forward pass pads to a
+        similar length, and then stored.
+        """
+        rows, missing = self.embedding_store.lookup(texts)
+        embeddings = np.empty((len(texts), self.embedding_store.dim), dtype=self.embedding_dtype)
+        found = [i for i, row in enumerate(rows) if row >= 0]
+        if found:
+            embeddings[found] = self.embedding_store.vectors[[rows[i] for i in found]]
 
-        doc = nlp(text)
-        
+        order = sorted(missing, key=lambda i: -len(texts[i]))
+        for start in range(0, len(order), self.embedding_batch_size):
+            batch = order[start:start + self.embedding_batch_size]
+            batch_texts = [texts[i] for i in batch]
+            embeddings[batch] = self.sentence_model.encode(
+                batch_texts,
+                batch_size=self.embedding_batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+            self.embedding_store.add(batch_texts, embeddings[batch])
+        return embeddings
+
+    def analyze(self, text, doc):
         sentiment = self.sia.polarity_scores(text)
         is_complaint = sentiment['compound'] < -0.06  # play with this a bit
         
-        locations = [ent.text for ent in doc.ents if ent.label_ in ["LOC", "FAC"] and ent.text.lower() not in ["toronto", "ontario", "canada"]]
-        embeddings = self.sentence_model.encode(text)
+        locations = [ent.text for ent in doc.ents if ent.label_ in ["LOC", "FAC"] and ent.text.lower() not in IGNORED_LOCATIONS]
         
         coordinates = [self.get_coordinates(loc) for loc in locations]
         coordinates = [coord for coord in coordinates if coord is not None]
@@ -60,17 +98,41 @@ class Processor:
             'sentiment': sentiment,
             'locations': locations,
             'coordinates': coordinates,
-            'embeddings': embeddings
         }
 
-    def process_data_website(self, data):
-        processed_data = []
-        try:
-            for item in tqdm(data, desc="Processing data"):
+    def process_text(self, text, nlp):
+        if not isinstance(text, str):
+            text = str(text)  
+        analysis = self.analyze(text, nlp(text))
+        analysis['embeddings'] = self.embed([text])[0]
+        return analysis
+
+    def process_items(self, data, nlp, embed=True):
+        """
+        Stream (item, doc) pairs through nlp.pipe and yield the processed item dicts in input order.
+        Embeddings are computed per chunk of EMBEDDING_CHUNK_SIZE items, unless `embed` is False.
+        """
+        texts = ((f"{item['title']} {item['body']}", item) for item in data)
+        docs = nlp.pipe(texts, as_tuples=True, batch_size=self.batch_size, n_process=self.n_process)
+        pending = []
+        embedded, embedding_time = 0, 0.0
+
+        def flush():
+            nonlocal embedded, embedding_time
+            start = time.perf_counter()
+            embeddings = self.embed([text for text, _ in pending])
+            embedded += len(pending)
+            embedding_time += time.perf_counter() - start
+            progress.set_postfix(embedding=f"{embedded / embedding_time:.1f} docs/s")
+            for (_, processed_item), embedding in zip(pending, embeddings):
+                processed_item['embeddings'] = embedding
+            return [processed_item for _, processed_item in pending]
+
+        total = len(data) if hasattr(data, "__len__") else None
+        with tqdm(docs, total=total, desc="Processing data", unit="docs") as progress:
+            for doc, item in progress:
                 try:
-                    full_text = f"{item['title']} {item['body']}"
-                    analysis = self.process_text(full_text, self.nlp_website)
-                    
+                    analysis = self.analyze(doc.text, doc)
                     processed_item = {
                         'title': item['title'],
                         'body': item['body'],
@@ -80,48 +142,29 @@ class Processor:
                         'sentiment': analysis['sentiment'],
                         'locations': analysis['locations'],
                         'coordinates': analysis['coordinates'],
-                        'embeddings': analysis['embeddings']
                     }
-                    processed_data.append(processed_item)
                 except Exception as e:
                     print(f"Error processing item: {e}")
                     print(f"Problematic item: {item}")
-            
-            return processed_data
+                    continue
+                if not embed:
+                    yield processed_item
+                    continue
+                pending.append((doc.text, processed_item))
+                if len(pending) >= EMBEDDING_CHUNK_SIZE:
+                    yield from flush()
+                    pending = []
+            if pending:
+                yield from flush()
+
+    def process_data_website(self, data):
+        try:
+            return list(self.process_items(data, self.nlp_website))
         except Exception as e:
             print(f"An error occurred: {e}")
 
     def process_data_reddit(self, data):
-        processed_data = []
-        import re
-
-        # def extract_urls(text):
-        #     url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-        #     return url_pattern.findall(text)
-        
         try:
-            for item in tqdm(data, desc="Processing data"):
-                try:
-                    full_text = f"{item['title']} {item['body']}"
-                    analysis = self.process_text(full_text, self.nlp_reddit)
-
-
-                    processed_item = {
-                        'title': item['title'],
-                        'body': item['body'],
-                        'url': item['url'],
-                        'created_at': item['created'],
-                        'is_complaint': analysis['is_complaint'],
-                        'sentiment': analysis['sentiment'],
-                        'locations': analysis['locations'],
-                        'coordinates': analysis['coordinates'],
-                        'embeddings': analysis['embeddings']
-                    }
-                    processed_data.append(processed_item)
-                except Exception as e:
-                    print(f"Error processing item: {e}")
-                    print(f"Problematic item: {item}")
-            
-            return processed_data
+            return list(self.process_items(data, self.nlp_reddit))
         except Exception as e:
-            print(f"An error occurred: {e}")
\ No newline at end of file
+            print(f"An error occurred: {e}")
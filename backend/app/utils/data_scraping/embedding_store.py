@@ -0,0 +1,119 @@
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+
+EMBEDDING_STORE_DIR = "backend/data/embeddings"
+KEY_SIZE = 16
+
+def normalize_text(text: str) -> str:
+    """
+    Text as it's keyed in the store: unicode-normalized with whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class EmbeddingStore:
+    """
+    On-disk embeddings keyed by a hash of the model name and normalized text.
+
+    Vectors are appended to a flat binary file that's read through np.memmap; the matching keys go to a
+    side file of 16-byte digests, row for row, and are loaded into a dict on open. Rows past the shorter of
+    the two files (an interrupted write) are ignored and overwritten.
+    """
+    def __init__(self, model_name: str, dim: int, dtype: str = "float32", directory: str = EMBEDDING_STORE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.model_name = model_name
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.row_size = self.dim * self.dtype.itemsize
+
+        slug = re.sub(r"[^\w.-]+", "_", model_name)
+        name = f"{slug}.{dim}.{self.dtype.name}"
+        self.vectors_path = os.path.join(directory, f"{name}.bin")
+        self.keys_path = os.path.join(directory, f"{name}.keys")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        keys = open(self.keys_path, "rb").read() if os.path.exists(self.keys_path) else b""
+        vector_rows = os.path.getsize(self.vectors_path) // self.row_size if os.path.exists(self.vectors_path) else 0
+        self.rows = min(len(keys) // KEY_SIZE, vector_rows)
+        self.index = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(self.rows)}
+        self._truncate()
+        self._vectors = None
+
+    def __len__(self):
+        return self.rows
+
+    def _truncate(self):
+        for path, size in ((self.vectors_path, self.row_size), (self.keys_path, KEY_SIZE)):
+            with open(path, "ab") as f:
+                f.truncate(self.rows * size)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Read-only memmap over the stored rows, reopened after appends.
+        """
+        if self._vectors is None or len(self._vectors) != self.rows:
+            if self.rows == 0:
+                return np.empty((0, self.dim), dtype=self.dtype)
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.rows, self.dim))
+        return self._vectors
+
+    def key(self, text: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.digest()
+
+    def get(self, text: str) -> np.ndarray | None:
+        """
+        The stored vector for a text as a view into the memmap, or None.
+        """
+        row = self.index.get(self.key(text))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.vectors[row]
+
+    def lookup(self, texts) -> tuple[list[int], list[int]]:
+        """
+        Row per text (-1 where it isn't stored) and the indices of the texts that aren't stored.
+        """
+        rows = [self.index.get(self.key(text), -1) for text in texts]
+        missing = [i for i, row in enumerate(rows) if row < 0]
+        self.hits += len(rows) - len(missing)
+        self.misses += len(missing)
+        return rows, missing
+
+    def add(self, texts, embeddings):
+        embeddings = np.ascontiguousarray(embeddings, dtype=self.dtype).reshape(-1, self.dim)
+        with self.lock:
+            new = {}
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(text)
+                if key not in self.index and key not in new:
+                    new[key] = embedding
+            if not new:
+                return
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(list(new.values())).tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new))
+            for i, key in enumerate(new):
+                self.index[key] = self.rows + i
+            self.rows += len(new)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,133 @@
+import re
+import codecs
+from urllib.parse import urljoin
+from lxml import etree
+from lxml import html as lxml_html
+
+DEFAULT_MAX_CHARS = 6000
+
+# never part of the readable page
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "form", "button", "select",
+    "nav", "header", "footer", "aside",
+}
+# emitted whole, as one fragment each
+BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "dt", "dd", "blockquote", "pre", "figcaption", "caption"}
+# text flows through these into the surrounding fragment
+INLINE_TAGS = {"a", "span", "strong", "em", "b", "i", "u", "small", "abbr", "code", "br", "sup", "sub", "time", "mark", "label", "img"}
+
+HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+META_CHARSET = re.compile(rb"<meta[^>]+charset=", re.I)
+BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+def detect_encoding(content: bytes, content_type: str = "") -> str | None:
+    """
+    Encoding to decode a page with: the charset in its Content-Type header, else None when the page declares
+    its own (a BOM or <meta charset>) for lxml to read, else UTF-8 if the bytes are valid UTF-8, else windows-1252.
+    """
+    match = HEADER_CHARSET.search(content_type or "")
+    if match:
+        try:
+            codecs.lookup(match.group(1))
+            return match.group(1)
+        except LookupError:
+            pass
+    if content.startswith(BOMS) or META_CHARSET.search(content[:4096]):
+        return None
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "windows-1252"
+
+def parse_html(content: str | bytes, content_type: str = ""):
+    """
+    Parse a page with lxml. Bytes are decoded per detect_encoding, so pass the response's Content-Type header
+    when there is one. Returns None for an empty or unparseable document.
+    """
+    if isinstance(content, str):
+        content, encoding = content.encode("utf-8"), "utf-8"
+    else:
+        encoding = detect_encoding(content, content_type)
+    parser = lxml_html.HTMLParser(encoding=encoding, remove_comments=True)
+    try:
+        return lxml_html.document_fromstring(content, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+
+def page_title(root, default: str = " ") -> str:
+    title = root.findtext(".//title") if root is not None else None
+    return title.strip() if title and title.strip() else default
+
+def main_content(root):
+    """
+    The page's <main> (or role="main", or single <article>) element if it has one, else <body>.
+    """
+    for path in ("//main", "//*[@role='main']", "//article"):
+        found = root.xpath(path)
+        if len(found) == 1:
+            return found[0]
+    body = root.find("body")
+    return body if body is not None else root
+
+class _TextCollector:
+    def __init__(self, max_chars: int, loose_text: bool):
+        self.max_chars = max_chars
+        self.loose_text = loose_text
+        self.fragments = []
+        self.seen = set()
+        self.length = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def emit(self, text: str):
+        text = " ".join(text.split())
+        if text and text not in self.seen:
+            self.seen.add(text)
+            self.fragments.append(text)
+            self.length += len(text) + 1
+
+    def walk(self, element):
+        loose = [element.text or ""]
+        for child in element:
+            if self.full:
+                return
+            tag = child.tag if isinstance(child.tag, str) else None
+            if tag is None or tag in SKIP_TAGS:
+                pass
+            elif tag in INLINE_TAGS:
+                loose.append(child.text_content())
+            else:
+                if self.loose_text:
+                    self.emit(" ".join(loose))
+                loose = []
+                if tag in BLOCK_TAGS:
+                    self.emit(child.text_content())
+                else:
+                    self.walk(child)
+            loose.append(child.tail or "")
+        if self.loose_text and not self.full:
+            self.emit(" ".join(loose))
+
+def extract_text(root, max_chars: int = DEFAULT_MAX_CHARS, loose_text: bool = True) -> str:
+    """
+    Readable text of a parsed page in one walk of its main content, stopping once `max_chars` is reached.
+
+    Block elements (paragraphs, list items, headings, cells) are emitted whole; with `loose_text`, text
+    sitting directly in containers like <div> is emitted too. Repeated fragments are dropped.
+    """
+    if root is None:
+        return ""
+    collector = _TextCollector(max_chars, loose_text)
+    collector.walk(main_content(root))
+    return " ".join(collector.fragments)[:max_chars]
+
+def extract_links(root, base_url: str) -> list[str]:
+    """
+    Absolute URLs of the page's links, in document order.
+    """
+    if root is None:
+        return []
+    return [urljoin(base_url, href) for href in root.xpath("//a/@href")]
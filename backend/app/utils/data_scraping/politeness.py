@@ -0,0 +1,44 @@
+import time
+import threading
+import requests
+from collections import defaultdict
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (compatible; CiceroBot/1.0)"
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """
+    A requests Session whose connection pool fits `pool_size` concurrent requests per host, so worker threads
+    reuse keep-alive connections instead of opening new ones.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+class HostLimiter:
+    """
+    Caps concurrent requests per host at `max_per_host` and spaces their starts at least `delay` seconds apart.
+    """
+    def __init__(self, max_per_host: int = 2, delay: float = 0.5):
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.semaphores = defaultdict(lambda: threading.Semaphore(self.max_per_host))
+        self.next_start = defaultdict(float)
+
+    @contextmanager
+    def limit(self, host: str):
+        with self.lock:
+            semaphore = self.semaphores[host]
+        with semaphore:
+            with self.lock:
+                start = max(time.monotonic(), self.next_start[host])
+                self.next_start[host] = start + self.delay
+            wait = start - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            yield
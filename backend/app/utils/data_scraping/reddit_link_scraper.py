@@ -1,37 +1,82 @@
-from bs4 import BeautifulSoup
 import requests
 from urllib.parse import urlparse
 import time
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from .html_text import extract_text, page_title, parse_html
+from .politeness import HostLimiter, make_session
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+SKIPPED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.pdf', '.mp4', '.mov', '.zip')
+MAX_PAGE_BYTES = 5 * 1024 * 1024
 
 class RedditLinkScraper:
-    def __init__(self):
-        pass  
+    """
+    Scrapes the pages that Reddit link posts point to. Only HTML pages under `max_bytes` are downloaded;
+    anything else is turned away from its URL or response headers before the body is read.
+    """
+    def __init__(self, max_workers=8, max_per_domain=2, delay=0.5, timeout=(5, 15), max_bytes=MAX_PAGE_BYTES):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = make_session(max_workers)
+        self.limiter = HostLimiter(max_per_domain, delay)
 
     def get_domain(self, url):
         return urlparse(url).netloc
 
+    def fetch_html(self, url):
+        """
+        Download a page's HTML and its Content-Type header, or return None for non-HTML and oversized responses.
+        """
+        if urlparse(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            print(f"Skipping {url}: not a web page")
+            return None
+
+        with self.limiter.limit(self.get_domain(url)):
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in HTML_CONTENT_TYPES:
+                    print(f"Skipping {url}: {content_type}")
+                    return None
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > self.max_bytes:
+                    print(f"Skipping {url}: {length} bytes")
+                    return None
+
+                # Content-Length can be missing or wrong, so the cap is enforced while reading too
+                chunks, size = [], 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        print(f"Skipping {url}: over {self.max_bytes} bytes")
+                        return None
+                    chunks.append(chunk)
+                return b"".join(chunks), response.headers.get("Content-Type", "")
+
     def scrape_link(self, url, reddit_url):
         """
         Scrapes content from a single URL and returns the data
         """
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            
+            page = self.fetch_html(url)
+            if page is None:
+                return None
+
             domain = self.get_domain(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            root = parse_html(*page)
 
-            text = " ".join([p.get_text() for p in soup.find_all('p')])
-            
-            max_text_length = 6000
-            text = text[:max_text_length] if len(text) > max_text_length else text
+            # paragraph-level blocks only: link posts are mostly articles, and their container text is site chrome
+            text = extract_text(root, max_chars=6000, loose_text=False)
 
             print(f"Scraped link {url}")
-            
+
             return {
                 "url": url,
                 "reddit_url": reddit_url,
-                "title": soup.title.string if soup.title else " ",
+                "title": page_title(root),
                 "domain": domain,
                 "body": text,
                 "created": time.time()
@@ -40,3 +85,20 @@ class RedditLinkScraper:
         except requests.RequestException as e:
             print(f"Failed to retrieve {url}: {e}")
             return None
+
+    def scrape_links(self, links):
+        """
+        Scrape (url, reddit_url) pairs concurrently. Returns the scraped records in input order, without failures.
+        """
+        links = list(links)
+
+        def scrape(link):
+            try:
+                return self.scrape_link(*link)
+            except Exception as e:
+                print(f"Failed to scrape link {link[0]}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(tqdm(pool.map(scrape, links), total=len(links), desc="Scraping link posts"))
+        return [result for result in results if result is not None]
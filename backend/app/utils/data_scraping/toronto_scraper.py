@@ -1,23 +1,33 @@
-from bs4 import BeautifulSoup
 import requests
 import time
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import re
 import io
 from PyPDF2 import PdfReader
 from tqdm import tqdm
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .politeness import HostLimiter, make_session
+from .html_text import extract_links, extract_text, page_title, parse_html
 
 class TorontoScraper: 
     """
-    Scrapes the Toronto government website for data
+    Scrapes the Toronto government website for data.
+
+    Pages are fetched by `max_workers` threads over one pooled Session, with at most `max_per_host` requests
+    in flight per host, started at least `delay` seconds apart.
     """
-    def __init__(self, path_focus):
+    def __init__(self, path_focus, max_workers=8, max_per_host=4, delay=0.25, timeout=15):
         self.url = None
         self.visited = set()
         self.to_visit = deque()
+        self.queued = set() # everything ever put on to_visit, so a url is only fetched once
         self.data = []
         self.path_focus = path_focus
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = make_session(max_workers)
+        self.limiter = HostLimiter(max_per_host, delay)
 
     def get_domain(self, url):
         return urlparse(url).netloc
@@ -45,75 +55,68 @@ class TorontoScraper:
     #         text += page.extract_text() + "\n"
     #     return text
 
-    def crawl_website_toronto(self, url, max_pages=500, delay=1, max_text_length=6000):
+    def fetch_page(self, url, domain, max_text_length):
+        """
+        Fetch and parse one page: returns its record and the crawlable links on it, or (None, []) on failure.
+        """
+        try:
+            with self.limiter.limit(domain):
+                response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Failed to retrieve {url}: {e}")
+            return None, []
+
+        root = parse_html(response.content, response.headers.get("Content-Type", ""))
+        record = {
+            "url": url,
+            "title": page_title(root),
+            "domain": domain,
+            "body": extract_text(root, max_text_length),
+            "created": time.time()
+        }
+
+        links = [
+            next_url for next_url in extract_links(root, url)
+            if self.get_domain(next_url) == domain and self.is_valid_url(next_url) and not self.is_document(next_url)
+        ]
+        return record, links
+
+    def enqueue(self, url):
+        if url not in self.queued and url not in self.visited:
+            self.queued.add(url)
+            self.to_visit.append(url)
+
+    def crawl_website_toronto(self, url, max_pages=500, delay=None, max_text_length=6000):
         self.url = url
+        if delay is not None:
+            self.limiter.delay = delay
         domain = self.get_domain(url)
-        self.to_visit = deque([url])   
-        
-        while self.to_visit and len(self.visited) < max_pages:
-            url = self.to_visit.pop()
-            if url in self.visited:
-                continue
-
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                self.visited.add(url)
-
-                # if url.lower().endswith('.pdf'):
-                #     text = extract_pdf_text(response.content)
-                #     data.append({
-                #         "url": url,
-                #         "title": url.split('/')[-1], 
-                #         "domain": domain,
-                #         "body": text,
-                #         "created": time.time()
-                #     })
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                text = " ".join([p.get_text() for p in soup.find_all('p')])
-                text += " ".join([li.get_text() for li in soup.find_all('li')])
-                text += " ".join([h1.get_text() for h1 in soup.find_all('h1')])
-                text += " ".join([div.get_text() for div in soup.find_all('div')])
-                
-                text = text[:max_text_length] if len(text) > max_text_length else text
-                self.data.append({
-                    "url": url,
-                    "title": soup.title.string if soup.title else " ",
-                    "domain": domain,
-                    "body": text,
-                    "created": time.time()
-                })
-
-                for link in soup.find_all('a', href=True):
-                    next_url = urljoin(url, link['href'])
-                    if self.get_domain(next_url) == domain and self.is_valid_url(next_url) and not self.is_document(next_url):
-                        if next_url not in self.visited and next_url not in self.to_visit:
-                            self.to_visit.append(next_url)
-                print(f"Crawled {url}")
-
-                for div in soup.find_all('div'):
-                    for link in div.find_all('a', href=True):
-                        next_url = urljoin(url, link['href'])
-                        if self.get_domain(next_url) == domain and next_url not in self.visited and next_url not in self.to_visit and self.is_valid_url(next_url):
-                            self.to_visit.append(next_url)
-
-                for ul in soup.find_all('ul'):
-                    for link in ul.find_all('a', href=True):
-                        next_url = urljoin(url, link['href'])
-                        if self.get_domain(next_url) == domain and next_url not in self.visited and next_url not in self.to_visit and self.is_valid_url(next_url):
-                            self.to_visit.append(next_url)
-                            
-                for ol in soup.find_all('ol'):
-                    for link in ol.find_all('a', href=True):
-                        next_url = urljoin(url, link['href'])
-                        if self.get_domain(next_url) == domain and next_url not in self.visited and next_url not in self.to_visit and self.is_valid_url(next_url):
-                            self.to_visit.append(next_url)
-            except requests.RequestException as e:
-                print(f"Failed to retrieve {url}: {e}")
-
-            #time.sleep(delay)  
+        self.to_visit = deque()
+        self.queued = set()
+        self.enqueue(url)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while self.to_visit or in_flight:
+                # never have more pages in flight than could still count towards max_pages
+                while self.to_visit and len(in_flight) < self.max_workers and len(self.visited) + len(in_flight) < max_pages:
+                    next_url = self.to_visit.pop()
+                    in_flight[pool.submit(self.fetch_page, next_url, domain, max_text_length)] = next_url
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url = in_flight.pop(future)
+                    record, links = future.result()
+                    if record is None:
+                        continue
+                    self.visited.add(page_url)
+                    self.data.append(record)
+                    print(f"Crawled {page_url}")
+                    for link in links:
+                        self.enqueue(link)
 
         return self.data
 
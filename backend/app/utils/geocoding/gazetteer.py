@@ -0,0 +1,154 @@
+import os
+import re
+import csv
+import difflib
+import threading
+from collections import defaultdict
+from utils.geocoding.normalize import normalize_location
+
+GAZETTEER_PATH = "backend/data/toronto_gazetteer.csv"
+
+# spelled-out street words -> the abbreviation Toronto's centreline data uses
+STREET_WORDS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr",
+    "crescent": "cres", "court": "crt", "place": "pl", "square": "sq", "parkway": "pkwy",
+    "lane": "lane", "terrace": "ter", "circle": "crcl", "gardens": "gdns", "highway": "hwy",
+    "expressway": "expy", "trail": "trl", "west": "w", "east": "e", "north": "n", "south": "s",
+}
+DIRECTIONS = {"n", "s", "e", "w"}
+# stripped for names written without a street type; directions are kept, Bloor St E and Bloor St W are kilometres apart
+STREET_TYPES = set(STREET_WORDS.values()) - DIRECTIONS
+INTERSECTION_SEPARATORS = re.compile(r"\s*(?:&|\band\b|\bat\b)\s*")
+
+def normalize_name(text: str) -> str:
+    """
+    Gazetteer key for a place name. Intersections become their two streets in sorted order, joined by " & ".
+    """
+    text = normalize_location(text.replace("/", " & ")).replace(",", " ")
+    streets = [street for street in INTERSECTION_SEPARATORS.split(text) if street.strip()]
+    streets = [" ".join(STREET_WORDS.get(word, word) for word in street.split()) for street in streets]
+    return " & ".join(sorted(streets))
+
+def strip_street_types(key: str) -> str:
+    """
+    "bloor st w & spadina ave" -> "bloor w & spadina", for names written without street types.
+    """
+    streets = []
+    for street in key.split(" & "):
+        words = street.split()
+        streets.append(" ".join(word for i, word in enumerate(words) if i == 0 or word not in STREET_TYPES))
+    return " & ".join(sorted(streets))
+
+def directions(key: str) -> list[tuple[str, ...]]:
+    """
+    The directions in each street of a key, e.g. [("w",), ()] for "bloor st w & spadina ave".
+    """
+    return sorted(tuple(sorted(set(street.split()) & DIRECTIONS)) for street in key.split(" & "))
+
+
+class Gazetteer:
+    """
+    Offline lookup of Toronto streets, intersections and neighbourhoods: exact matches through a hash index,
+    near misses through fuzzy matching within the entries that share a first word.
+    """
+    def __init__(self, entries: list[tuple[str, float, float]] = (), fuzzy_cutoff: float = 0.88):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.index: dict[str, tuple[float, float]] = {}
+        self.buckets: dict[str, list[str]] = defaultdict(list)
+        for name, latitude, longitude in entries:
+            self.add(name, latitude, longitude)
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def _add_key(self, key: str, coordinates: tuple[float, float]):
+        if key and key not in self.index:
+            self.index[key] = coordinates
+            self.buckets[key.split()[0]].append(key)
+
+    def add(self, name: str, latitude: float, longitude: float):
+        key = normalize_name(name)
+        self._add_key(key, (latitude, longitude))
+        # first come, first kept when several entries share a name once street types are dropped
+        self._add_key(strip_street_types(key), (latitude, longitude))
+
+    @classmethod
+    def from_csv(cls, path: str = GAZETTEER_PATH) -> "Gazetteer":
+        """
+        Load a CSV with name, latitude and longitude columns (see build_gazetteer).
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = [(row["name"], float(row["latitude"]), float(row["longitude"])) for row in csv.DictReader(f)]
+        return cls(entries)
+
+    def lookup(self, query: str) -> tuple[float, float] | None:
+        key = normalize_name(query)
+        if not key:
+            return None
+
+        for candidate in (key, strip_street_types(key)):
+            if candidate in self.index:
+                self.hits += 1
+                return self.index[candidate]
+
+        # a near miss must agree on direction: "queen st e" is one letter from "queen st w"
+        candidates = [name for name in self.buckets.get(key.split()[0], []) if directions(name) == directions(key)]
+        matches = difflib.get_close_matches(key, candidates, n=1, cutoff=self.fuzzy_cutoff)
+        if matches:
+            self.fuzzy_hits += 1
+            return self.index[matches[0]]
+
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "hits": self.hits, "fuzzy_hits": self.fuzzy_hits, "misses": self.misses}
+
+
+def build_gazetteer(intersections_path: str, centreline_path: str, neighbourhoods_path: str, output_path: str = GAZETTEER_PATH):
+    """
+    Write the gazetteer CSV from Toronto Open Data layers: centreline intersections, street centreline and neighbourhoods.
+    """
+    import geopandas as gpd
+
+    layers = [
+        (intersections_path, "INTERSECTION_DESC", "intersection"),
+        (centreline_path, "LINEAR_NAME_FULL", "street"),
+        (neighbourhoods_path, "AREA_NAME", "neighbourhood"),
+    ]
+    rows = []
+    for path, column, kind in layers:
+        layer = gpd.read_file(path).to_crs(4326)
+        layer = layer[layer[column].notna()]
+        # one point per name: a street's many centreline segments collapse to a point on the street
+        points = layer.dissolve(by=column).representative_point()
+        rows.extend((name, point.y, point.x, kind) for name, point in points.items())
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "latitude", "longitude", "kind"])
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} gazetteer entries to {output_path}")
+
+
+_gazetteer: Gazetteer | None = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    """
+    The process-wide gazetteer, loaded on first use. Empty if the data file is missing.
+    """
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                if os.path.exists(GAZETTEER_PATH):
+                    _gazetteer = Gazetteer.from_csv(GAZETTEER_PATH)
+                    print(f"Loaded {len(_gazetteer)} gazetteer entries")
+                else:
+                    print(f"No gazetteer at {GAZETTEER_PATH}, geocoding over the network only")
+                    _gazetteer = Gazetteer()
+    return _gazetteer
@@ -0,0 +1,159 @@
+import os
+import time
+import sqlite3
+import threading
+from geopy.geocoders import Nominatim
+from utils.geocoding.normalize import normalize_location
+from utils.geocoding.gazetteer import Gazetteer, get_gazetteer
+
+GEOCODE_CACHE_PATH = "backend/data/geocode_cache.sqlite"
+GEOCODE_TTL = 90 * 24 * 3600 # places rarely move
+NEGATIVE_GEOCODE_TTL = 7 * 24 * 3600 # unresolvable names are retried sooner in case the geocoder improves
+
+# Nominatim's limit is per application, so requests are spaced across every geocoder in the process
+_last_nominatim_request = 0.0
+_nominatim_lock = threading.Lock()
+
+class GeocodeCache:
+    """
+    SQLite-backed geocoding results keyed by normalized query, with expiry. Misses (no result) are cached too.
+    """
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, ttl: float = GEOCODE_TTL, negative_ttl: float = NEGATIVE_GEOCODE_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "key TEXT PRIMARY KEY, latitude REAL, longitude REAL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> tuple[bool, tuple[float, float] | None]:
+        """
+        Return (found, coordinates). Coordinates are None for a cached miss.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT latitude, longitude FROM geocodes WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            if row[0] is None:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+            return True, (row[0], row[1])
+
+    def set(self, key: str, coordinates: tuple[float, float] | None):
+        ttl = self.ttl if coordinates is not None else self.negative_ttl
+        latitude, longitude = coordinates if coordinates is not None else (None, None)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocodes (key, latitude, longitude, expires_at) VALUES (?, ?, ?, ?)",
+                (key, latitude, longitude, time.time() + ttl)
+            )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+
+class CachedGeocoder:
+    """
+    Offline gazetteer first, then Nominatim behind the shared cache. Network lookups from all geocoders
+    in the process are spaced `min_delay` seconds apart, per Nominatim's usage policy.
+    """
+    def __init__(
+        self,
+        user_agent: str,
+        cache: GeocodeCache | None = None,
+        gazetteer: Gazetteer | None = None,
+        min_delay: float = 1.0,
+        timeout: float = 10,
+    ):
+        self.geolocator = Nominatim(user_agent=user_agent, timeout=timeout)
+        self.cache = cache if cache is not None else get_geocode_cache()
+        self.gazetteer = gazetteer if gazetteer is not None else get_gazetteer()
+        self.min_delay = min_delay
+
+    def _lookup(self, query: str):
+        global _last_nominatim_request
+        with _nominatim_lock:
+            wait = _last_nominatim_request + self.min_delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return self.geolocator.geocode(query)
+            finally:
+                _last_nominatim_request = time.monotonic()
+
+    def geocode(self, query: str) -> tuple[float, float] | None:
+        coordinates = self.gazetteer.lookup(query)
+        if coordinates is not None:
+            return coordinates
+
+        key = normalize_location(query)
+        found, coordinates = self.cache.get(key)
+        if found:
+            return coordinates
+
+        try:
+            location = self._lookup(query)
+        except Exception as e:
+            # errors aren't cached: they say nothing about the place, only about the network
+            print(f"Error geocoding {query}: {e}")
+            return None
+
+        coordinates = (location.latitude, location.longitude) if location else None
+        self.cache.set(key, coordinates)
+        return coordinates
+
+    def stats(self) -> dict:
+        return {"gazetteer": self.gazetteer.stats(), "cache": self.cache.stats()}
+
+
+_geocode_cache: GeocodeCache | None = None
+_geocode_cache_lock = threading.Lock()
+
+def get_geocode_cache() -> GeocodeCache:
+    """
+    The process-wide geocode cache, opened on first use.
+    """
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = GeocodeCache()
+    return _geocode_cache
+
+
+_cached_geocoder: CachedGeocoder | None = None
+_cached_geocoder_lock = threading.Lock()
+
+def get_cached_geocoder() -> CachedGeocoder:
+    """
+    The process-wide geocoder for the API, created on first use so proposals don't build one per job.
+    """
+    global _cached_geocoder
+    if _cached_geocoder is None:
+        with _cached_geocoder_lock:
+            if _cached_geocoder is None:
+                _cached_geocoder = CachedGeocoder(user_agent="cicero")
+    return _cached_geocoder
@@ -0,0 +1,14 @@
+import re
+
+# trailing parts callers append to scope a query to the city; they don't change what place is meant
+REGION_SUFFIXES = {"toronto", "ontario", "on", "canada"}
+
+def normalize_location(text: str) -> str:
+    """
+    Cache key for a location query: lowercased, punctuation and whitespace collapsed, region suffixes dropped.
+    """
+    parts = [re.sub(r"[^\w&]+", " ", part).strip() for part in text.lower().split(",")]
+    parts = [" ".join(part.split()) for part in parts if part.strip()]
+    while len(parts) > 1 and parts[-1] in REGION_SUFFIXES:
+        parts.pop()
+    return ", ".join(parts)
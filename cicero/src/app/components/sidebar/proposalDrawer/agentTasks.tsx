@@ -29,6 +29,7 @@ export default function AIAgentTask({ wsRef, clientId }: AIAgentTaskProps) {
   const handleMessage = (event: MessageEvent) => {
     console.log("WebSocket message received:", event.data);
     const data = JSON.parse(event.data);
+    if (data.type === "job") return; // job status messages are handled by the proposal drawer
     const { type: taskType, action: taskName, status, data: taskData } = data;
     setTasks((prev) => {
       const existingTask = prev.find((t) => t.name === taskName);
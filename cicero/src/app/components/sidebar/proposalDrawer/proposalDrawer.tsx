@@ -21,6 +21,55 @@ const ProposalDrawer = ({ isOpen, onClose, complaint, location, coordinates, sum
   const [isLoading, setIsLoading] = useState(false);
   const wsRef = useRef<WebSocket | null>(null);
   const clientId = useRef(Math.random().toString(36).substring(7)); // unique client id for the websocket
+  const cancelJobWaitRef = useRef<(() => void) | null>(null); // stops waiting on the current job when the drawer closes
+
+  // proposals run as background jobs: the result arrives over the websocket, with polling as a fallback
+  const waitForProposalJob = (jobId: string, socket: WebSocket | null) => new Promise<any>((resolve, reject) => {
+    const stop = () => {
+      clearInterval(poll);
+      socket?.removeEventListener('message', handleMessage);
+      cancelJobWaitRef.current = null;
+    };
+
+    const finish = (job: any) => {
+      stop();
+      if (job.status === 'completed') {
+        resolve(job.result);
+      } else {
+        reject(new Error(job.error));
+      }
+    };
+
+    const handleMessage = (event: MessageEvent) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'job' && data.job_id === jobId && (data.status === 'completed' || data.status === 'failed')) {
+        finish(data);
+      }
+    };
+
+    const poll = setInterval(async () => {
+      try {
+        const response = await fetch(`http://localhost:8000/api/proposals/jobs/${jobId}`);
+        if (!response.ok) {
+          // a 404 means the job is gone (e.g. the server restarted), so it will never finish
+          finish({ status: 'failed', error: `Proposal job lookup failed with status ${response.status}` });
+          return;
+        }
+        const job = await response.json();
+        if (job.status === 'completed' || job.status === 'failed') {
+          finish(job);
+        }
+      } catch (error) {
+        console.error('Error checking proposal job:', error);
+      }
+    }, 5000);
+
+    socket?.addEventListener('message', handleMessage);
+    cancelJobWaitRef.current = () => {
+      stop();
+      reject(new Error('cancelled'));
+    };
+  });
 
   const generateProposal = async () => {
     setIsLoading(true);
@@ -49,10 +98,18 @@ const ProposalDrawer = ({ isOpen, onClose, complaint, location, coordinates, sum
         credentials: 'include',
         body: JSON.stringify(proposalInput),
       });
-      const data = await response.json();
+      if (!response.ok) {
+        // 503 when the job queue is full, 422 for a malformed request
+        const error = await response.json().catch(() => null);
+        throw new Error(error?.detail ? JSON.stringify(error.detail) : `Proposal request failed with status ${response.status}`);
+      }
+      const job = await response.json();
+      const data = await waitForProposalJob(job.job_id, wsRef.current);
       setProposal(data.proposal.proposal);
     } catch (error) {
-      console.error('Error generating proposal:', error);
+      if ((error as Error).message !== 'cancelled') {
+        console.error('Error generating proposal:', error);
+      }
     }
     setIsLoading(false);
   };
@@ -66,6 +123,7 @@ const ProposalDrawer = ({ isOpen, onClose, complaint, location, coordinates, sum
       wsRef.current?.close();
     }
     return () => {
+      cancelJobWaitRef.current?.();
       wsRef.current?.close();
     };
   }, [isOpen, complaint]);